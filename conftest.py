@@ -0,0 +1,13 @@
+"""Purpose: Shared pytest fixtures, Qt tests run headless against a single application instance."""
+
+import os
+
+import pytest
+
+
+@pytest.fixture(scope='session')
+def qt_app():
+
+    QtWidgets = pytest.importorskip('PySide6.QtWidgets')
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
@@ -1,7 +1,10 @@
 """Purpose: Hold base classes for picross game."""
 
+import base64
 import dataclasses
 from enum import Enum
+import hashlib
+import json
 import random
 
 FILE_EXTENSION = 'json'
@@ -53,7 +56,8 @@ class BaseBoardMatrix:
             if len(self) != len(other):
                 return False
             for row, other_row in zip(self, other):
-                if row != other_row:
+                # Run length boards hand out tuple rows, so rows are compared as lists
+                if list(row) != list(other_row):
                     return False
             return True
         else:
@@ -64,6 +68,105 @@ class BaseBoardMatrix:
 
         return self._dimensions
 
+    def set_cells(self, positions, value):
+
+        # Returns the positions whose value actually changed
+        changed = []
+        for row_index, column_index in positions:
+            if 0 <= row_index < len(self._data) and 0 <= column_index < len(self._data[row_index]):
+                if self._data[row_index][column_index] != value:
+                    self._data[row_index][column_index] = value
+                    changed.append((row_index, column_index))
+        return changed
+
+    def draw_line(self, start, end, value):
+
+        # Bresenham line between two (row, column) positions
+        row_index, column_index = start
+        row_distance = abs(end[0] - start[0])
+        column_distance = -abs(end[1] - start[1])
+        row_step = 1 if end[0] > start[0] else -1
+        column_step = 1 if end[1] > start[1] else -1
+        error = row_distance + column_distance
+        positions = []
+        while True:
+            positions.append((row_index, column_index))
+            if (row_index, column_index) == tuple(end):
+                break
+            double_error = 2 * error
+            if double_error >= column_distance:
+                error += column_distance
+                row_index += row_step
+            if double_error <= row_distance:
+                error += row_distance
+                column_index += column_step
+        return self.set_cells(positions, value)
+
+    def draw_rectangle(self, start, end, value, filled=False):
+
+        top, bottom = sorted((start[0], end[0]))
+        left, right = sorted((start[1], end[1]))
+        if filled:
+            positions = [
+                (row_index, column_index)
+                for row_index in range(top, bottom + 1)
+                for column_index in range(left, right + 1)]
+        else:
+            positions = [(top, column_index) for column_index in range(left, right + 1)]
+            positions += [(bottom, column_index) for column_index in range(left, right + 1)]
+            positions += [(row_index, left) for row_index in range(top + 1, bottom)]
+            positions += [(row_index, right) for row_index in range(top + 1, bottom)]
+        return self.set_cells(positions, value)
+
+    def flood_fill(self, position, value):
+
+        # Scanline fill, each popped seed fills its whole horizontal span and seeds one cell per span above and below
+        target = self._data[position[0]][position[1]]
+        if target == value:
+            return []
+        changed = []
+        seeds = [tuple(position)]
+        while seeds:
+            row_index, column_index = seeds.pop()
+            row = self._data[row_index]
+            if row[column_index] != target:
+                continue
+            left = column_index
+            while left > 0 and row[left - 1] == target:
+                left -= 1
+            right = column_index
+            while right + 1 < len(row) and row[right + 1] == target:
+                right += 1
+            row[left:right + 1] = [value] * (right + 1 - left)
+            changed.extend((row_index, span_index) for span_index in range(left, right + 1))
+            for neighbour_index in (row_index - 1, row_index + 1):
+                if not 0 <= neighbour_index < len(self._data):
+                    continue
+                neighbour_row = self._data[neighbour_index]
+                in_span = False
+                for span_index in range(left, right + 1):
+                    if neighbour_row[span_index] == target:
+                        if not in_span:
+                            seeds.append((neighbour_index, span_index))
+                        in_span = True
+                    else:
+                        in_span = False
+        return changed
+
+    def get_region(self, start, end):
+
+        top, bottom = sorted((start[0], end[0]))
+        left, right = sorted((start[1], end[1]))
+        return [list(row[left:right + 1]) for row in self._data[top:bottom + 1]]
+
+    def paste_region(self, region, position):
+
+        changed = []
+        for row_offset, region_row in enumerate(region):
+            for column_offset, value in enumerate(region_row):
+                changed += self.set_cells([(position[0] + row_offset, position[1] + column_offset)], value)
+        return changed
+
 
 class Board(BaseBoardMatrix):
 
@@ -72,10 +175,18 @@ class Board(BaseBoardMatrix):
 
         self.palette = Palette() if palette is None else palette
 
-    def randomize(self):
+    def copy(self):
+
+        new_board = self.__class__(dimensions=self.dimensions, palette=self.palette)
+        for row_index, row in enumerate(self._data):
+            new_board[row_index] = list(row)
+        return new_board
+
+    def randomize(self, seed=None):
 
+        generator = random if seed is None else random.Random(seed)
         for row_index in range(len(self._data)):
-            self._data[row_index] = [random.randint(0, self.palette.size) for _ in range(len(self._data[row_index]))]
+            self._data[row_index] = [generator.randint(0, self.palette.size) for _ in range(len(self._data[row_index]))]
 
     def get_axis_key(self, index, axis):
 
@@ -86,27 +197,56 @@ class Board(BaseBoardMatrix):
         else:
             raise ValueError('Axis argument is not a valid BoardAxis value.')
 
-        key = list()
-        last_value = sequence[0]
-        current_length = 0
-        for value in sequence:
-            if value == last_value:
-                current_length += 1
-            else:
-                if last_value != 0:
-                    key.append(KeyIsland(last_value, current_length))
-                current_length = 1
-            last_value = value
+        return get_sequence_key(sequence)
+
+    def get_solution_hash(self):
+
+        return hashlib.sha256(json.dumps(self._data, separators=(',', ':')).encode()).hexdigest()
+
+    def iter_symmetries(self):
+
+        # Yields all 8 rotations and reflections, 90 degree turns swap the dimensions of non-square boards
+        rows = [list(row) for row in self._data]
+        for _ in range(4):
+            yield rows
+            yield [row[::-1] for row in rows]
+            rows = [list(row) for row in zip(*rows[::-1])]
 
-        if last_value != 0:  # Capture final island after iteration
-            key.append(KeyIsland(last_value, current_length))
+    def get_canonical_hash(self):
 
-        return key if key else [KeyIsland(1, 0)]
+        # Puzzles are identified by their keys, so a board hashes like its clue-only copy
+        return BoardClues.from_board(self).get_canonical_hash()
+
+    def get_canonical_grid_hash(self):
+
+        # Tells apart different pictures that share their keys, still ignoring rotations, mirrors and recoloring
+        colors = [tuple(color) for color in self.palette.colors]
+        encodings = []
+        for rows in self.iter_symmetries():
+            cells = bytes(value for row in rows for value in row)
+            # Relabel palette indices in order of first appearance so color permutations encode the same
+            labels = {0: 0}
+            for value in cells:
+                if value not in labels:
+                    labels[value] = len(labels)
+            table = bytearray(range(256))
+            for value, label in labels.items():
+                table[value] = label
+            used_colors = [colors[value - 1] for value in sorted(labels, key=labels.get) if value]
+            unused_colors = sorted(color for index, color in enumerate(colors, 1) if index not in labels)
+            header = json.dumps([len(rows), len(rows[0]), used_colors, unused_colors], separators=(',', ':'))
+            encodings.append(header.encode() + cells.translate(table))
+
+        return hashlib.blake2b(min(encodings), digest_size=16).hexdigest()
 
     def serialize(self):
 
         return {'dimensions': self.dimensions, 'rows': self._data, 'palette': self.palette.serialize()}
 
+    def serialize_clues(self):
+
+        return BoardClues.from_board(self).serialize()
+
     @classmethod
     def deserialize(cls, data):
 
@@ -118,6 +258,278 @@ class Board(BaseBoardMatrix):
         return new_board
 
 
+class RunLengthBoard(Board):
+
+    def __init__(self, dimensions=(5, 5), palette=None):
+
+        # Board is not initialized to avoid allocating the dense rows, every row starts as one empty run
+        self._dimensions = dimensions
+        self.palette = Palette() if palette is None else palette
+        self._runs = [[[0, dimensions[1]]] for _ in range(dimensions[0])]
+
+    def __getitem__(self, row_index):
+
+        # Rows are decoded into tuples so board[row][column] = value fails instead of writing to a throwaway copy,
+        # write cells through set_value or assign whole rows
+        return tuple(decode_runs(self._runs[row_index]))
+
+    def __setitem__(self, row_index, row_list):
+
+        if len(row_list) == self.dimensions[1]:
+            self._runs[row_index] = encode_runs(row_list)
+        else:
+            raise ValueError("Passed row does not match object's column dimesion")
+
+    def __iter__(self):
+
+        for runs in self._runs:
+            yield tuple(decode_runs(runs))
+
+    def __len__(self):
+
+        return len(self._runs)
+
+    @property
+    def _data(self):
+
+        return [decode_runs(runs) for runs in self._runs]
+
+    @property
+    def run_count(self):
+
+        return sum(len(runs) for runs in self._runs)
+
+    def get_runs(self, row_index):
+
+        return [tuple(run) for run in self._runs[row_index]]
+
+    def get_value(self, row_index, column_index):
+
+        start = 0
+        for value, length in self._runs[row_index]:
+            start += length
+            if column_index < start:
+                return value
+        raise IndexError('Column index is out of range.')
+
+    def set_value(self, row_index, column_index, value):
+
+        # Splits the run holding the cell and merges the result with matching neighbours, returns whether it changed
+        if not 0 <= column_index < self.dimensions[1]:
+            raise IndexError('Column index is out of range.')
+        runs = self._runs[row_index]
+        start = 0
+        for run_index, (run_value, length) in enumerate(runs):
+            if column_index < start + length:
+                break
+            start += length
+        if run_value == value:
+            return False
+
+        offset = column_index - start
+        replacement = [[run_value, offset], [value, 1], [run_value, length - offset - 1]]
+        runs[run_index:run_index + 1] = [run for run in replacement if run[1]]
+        value_index = run_index + (1 if offset else 0)
+        if value_index + 1 < len(runs) and runs[value_index + 1][0] == value:
+            runs[value_index][1] += runs.pop(value_index + 1)[1]
+        if value_index > 0 and runs[value_index - 1][0] == value:
+            runs[value_index - 1][1] += runs.pop(value_index)[1]
+        return True
+
+    def set_cells(self, positions, value):
+
+        return [
+            (row_index, column_index) for row_index, column_index in positions
+            if 0 <= row_index < len(self._runs) and 0 <= column_index < self.dimensions[1]
+            and self.set_value(row_index, column_index, value)]
+
+    def flood_fill(self, position, value):
+
+        changed = self.to_board().flood_fill(position, value)
+        return self.set_cells(changed, value)
+
+    def copy(self):
+
+        new_board = self.__class__(dimensions=self.dimensions, palette=self.palette)
+        new_board._runs = [[list(run) for run in runs] for runs in self._runs]
+        return new_board
+
+    def randomize(self, seed=None):
+
+        generator = random if seed is None else random.Random(seed)
+        for row_index in range(len(self._runs)):
+            self[row_index] = [generator.randint(0, self.palette.size) for _ in range(self.dimensions[1])]
+
+    def get_axis_key(self, index, axis):
+
+        if axis == BoardAxis.ROW:
+            key = [KeyIsland(value, length) for value, length in self._runs[index] if value != 0]
+            return key if key else [KeyIsland(1, 0)]
+        elif axis == BoardAxis.COLUMN:
+            return get_sequence_key([self.get_value(row_index, index) for row_index in range(len(self._runs))])
+        else:
+            raise ValueError('Axis argument is not a valid BoardAxis value.')
+
+    @classmethod
+    def from_board(cls, board):
+
+        new_board = cls(dimensions=board.dimensions, palette=board.palette)
+        for row_index, row in enumerate(board):
+            new_board[row_index] = row
+        return new_board
+
+    def to_board(self):
+
+        new_board = Board(dimensions=self.dimensions, palette=self.palette)
+        for row_index, runs in enumerate(self._runs):
+            new_board[row_index] = decode_runs(runs)
+        return new_board
+
+    def serialize(self):
+
+        return {'dimensions': self.dimensions, 'runs': self._runs, 'palette': self.palette.serialize()}
+
+    @classmethod
+    def deserialize(cls, data):
+
+        new_palette = Palette.deserialize(data['palette'])
+        new_board = cls(dimensions=data['dimensions'], palette=new_palette)
+        for row_index, runs in enumerate(data['runs']):
+            # Stored runs are normalized so split neighbours and empty runs cannot leak into the row keys
+            row = decode_runs(runs)
+            if len(row) != new_board.dimensions[1]:
+                raise ValueError("Passed runs do not match object's column dimesion")
+            new_board._runs[row_index] = encode_runs(row)
+
+        return new_board
+
+
+class BoardClues:
+
+    def __init__(self, dimensions, palette, rows, columns, solution_hash=None):
+
+        self.dimensions = tuple(dimensions)
+        self.palette = palette
+        self.rows = rows
+        self.columns = columns
+        self.solution_hash = solution_hash
+
+    @classmethod
+    def from_board(cls, board):
+
+        rows = [board.get_axis_key(index, BoardAxis.ROW) for index in range(board.dimensions[0])]
+        columns = [board.get_axis_key(index, BoardAxis.COLUMN) for index in range(board.dimensions[1])]
+        return cls(board.dimensions, board.palette, rows, columns, board.get_solution_hash())
+
+    def get_axis_key(self, index, axis):
+
+        if axis == BoardAxis.ROW:
+            return self.rows[index]
+        elif axis == BoardAxis.COLUMN:
+            return self.columns[index]
+        else:
+            raise ValueError('Axis argument is not a valid BoardAxis value.')
+
+    def matches(self, board):
+
+        for axis, keys in ((BoardAxis.ROW, self.rows), (BoardAxis.COLUMN, self.columns)):
+            for index, key in enumerate(keys):
+                if board.get_axis_key(index, axis) != key:
+                    return False
+        return True
+
+    def check_solution(self, board):
+
+        return self.solution_hash is None or board.get_solution_hash() == self.solution_hash
+
+    def iter_symmetries(self):
+
+        # Yields (rows, columns) keys for all 8 rotations and reflections, mirroring a board reverses the order of
+        # the lines along one axis and the islands inside every key of the other axis
+        for rows, columns in ((self.rows, self.columns), (self.columns, self.rows)):
+            for reverse_rows in (False, True):
+                for reverse_columns in (False, True):
+                    symmetry_rows = rows[::-1] if reverse_rows else rows
+                    symmetry_columns = columns[::-1] if reverse_columns else columns
+                    yield (
+                        [key[::-1] for key in symmetry_rows] if reverse_columns else symmetry_rows,
+                        [key[::-1] for key in symmetry_columns] if reverse_rows else symmetry_columns)
+
+    def get_canonical_hash(self):
+
+        # Same idea as Board.get_canonical_grid_hash but read from the keys, so clue-only puzzles hash too
+        colors = [tuple(color) for color in self.palette.colors]
+        encodings = []
+        for rows, columns in self.iter_symmetries():
+            labels = {}
+            values = []
+            for key in rows + columns:
+                islands = [island for island in key if island.length]
+                values.append(len(islands))
+                for island in islands:
+                    if island.index not in labels:
+                        labels[island.index] = len(labels) + 1
+                    values.extend((labels[island.index], island.length))
+            used_colors = [colors[index - 1] for index in sorted(labels, key=labels.get)]
+            unused_colors = sorted(color for index, color in enumerate(colors, 1) if index not in labels)
+            header = json.dumps([len(rows), len(columns), used_colors, unused_colors], separators=(',', ':'))
+            encodings.append(header.encode() + encode_varints(values))
+
+        return hashlib.blake2b(min(encodings), digest_size=16).hexdigest()
+
+    def encode(self):
+
+        # Each island packs into one varint as (length - 1) * colors + (index - 1), after a per line island count.
+        color_count = self.palette.size
+        values = []
+        for key in self.rows + self.columns:
+            islands = [island for island in key if island.length]
+            values.append(len(islands))
+            for island in islands:
+                values.append((island.length - 1) * color_count + island.index - 1)
+        return encode_varints(values)
+
+    @classmethod
+    def decode(cls, data, dimensions, palette, solution_hash=None):
+
+        color_count = palette.size
+        if not color_count:
+            raise ValueError('Clues need a palette with at least one color.')
+        values = decode_varints(data)
+        keys = []
+        for _ in range(dimensions[0] + dimensions[1]):
+            key = []
+            island_count = next(values, None)
+            for _ in range(island_count or 0):
+                value = next(values, None)
+                if value is None:
+                    break
+                length, index = divmod(value, color_count)
+                key.append(KeyIsland(index + 1, length + 1))
+            if island_count is None or len(key) < island_count:
+                raise ValueError('Clue data ends before every line has its key.')
+            keys.append(key if key else [KeyIsland(1, 0)])
+        if next(values, None) is not None or (data and data[-1] & 0x80):
+            raise ValueError('Clue data has bytes left over after the last line.')
+
+        return cls(dimensions, palette, keys[:dimensions[0]], keys[dimensions[0]:], solution_hash)
+
+    def serialize(self):
+
+        return {
+            'dimensions': self.dimensions,
+            'clues': base64.b64encode(self.encode()).decode('ascii'),
+            'solution_hash': self.solution_hash,
+            'palette': self.palette.serialize()}
+
+    @classmethod
+    def deserialize(cls, data):
+
+        new_palette = Palette.deserialize(data['palette'])
+        return cls.decode(
+            base64.b64decode(data['clues']), data['dimensions'], new_palette, solution_hash=data.get('solution_hash'))
+
+
 class Palette:
 
     def __init__(self, colors=((40, 40, 40), )):
@@ -163,7 +575,80 @@ class BoardCrossState(BaseBoardMatrix):
     def deserialize(cls, data):
 
         new_board = cls(dimensions=data['dimensions'])
-        for row_index, row in enumerate(data['rows']):
+        for row_index, row in enumerate(data['crossed']):
             new_board[row_index] = row
 
         return new_board
+
+
+def get_sequence_key(sequence):
+
+    key = list()
+    last_value = sequence[0]
+    current_length = 0
+    for value in sequence:
+        if value == last_value:
+            current_length += 1
+        else:
+            if last_value != 0:
+                key.append(KeyIsland(last_value, current_length))
+            current_length = 1
+        last_value = value
+
+    if last_value != 0:  # Capture final island after iteration
+        key.append(KeyIsland(last_value, current_length))
+
+    return key if key else [KeyIsland(1, 0)]
+
+
+def encode_runs(sequence):
+
+    runs = []
+    for value in sequence:
+        if runs and runs[-1][0] == value:
+            runs[-1][1] += 1
+        else:
+            runs.append([value, 1])
+    return runs
+
+
+def decode_runs(runs):
+
+    sequence = []
+    for value, length in runs:
+        sequence.extend([value] * length)
+    return sequence
+
+
+def encode_varints(values):
+
+    encoded = bytearray()
+    for value in values:
+        while value > 0x7f:
+            encoded.append((value & 0x7f) | 0x80)
+            value >>= 7
+        encoded.append(value)
+    return bytes(encoded)
+
+
+def decode_varints(data):
+
+    value = 0
+    shift = 0
+    for byte in data:
+        value |= (byte & 0x7f) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            yield value
+            value = 0
+            shift = 0
+
+
+def deserialize_puzzle(data):
+
+    # Clue-only puzzles have no stored grid so the board half of the pair is None
+    if 'clues' in data:
+        return None, BoardClues.deserialize(data)
+    board = RunLengthBoard.deserialize(data) if 'runs' in data else Board.deserialize(data)
+    return board, BoardClues.from_board(board)
@@ -0,0 +1,73 @@
+"""Purpose: Find duplicate puzzles, including rotated, mirrored and recolored copies."""
+
+import argparse
+from concurrent import futures
+import json
+import os
+import shutil
+
+import core
+
+
+def get_puzzle_hash(path):
+
+    # Hashing the keys treats full and clue-only files of the same puzzle alike and never needs the solver, files
+    # with a grid also return its hash since different pictures can share their keys
+    try:
+        with open(path, 'r') as load_file:
+            board, clues = core.deserialize_puzzle(json.load(load_file))
+        return clues.get_canonical_hash(), None if board is None else board.get_canonical_grid_hash()
+    except (OSError, ValueError, KeyError, TypeError, IndexError):
+        return None
+
+
+def find_duplicates(paths, workers=None):
+
+    # Returns (duplicate, original) path pairs along with the paths that could not be read
+    index = {}
+    duplicates = []
+    unresolved = []
+    with futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        for path, puzzle_hash in zip(paths, executor.map(get_puzzle_hash, paths, chunksize=64)):
+            if puzzle_hash is None:
+                unresolved.append(path)
+                continue
+            clues_hash, grid_hash = puzzle_hash
+            # Originals sharing these keys by grid hash, None holds a clue-only file
+            originals = index.setdefault(clues_hash, {})
+            if grid_hash in originals:
+                duplicates.append((path, originals[grid_hash]))
+            elif grid_hash is None and originals:
+                duplicates.append((path, next(iter(originals.values()))))
+            else:
+                if None in originals:
+                    # A clue-only file seen before any picture with its keys duplicates that picture
+                    duplicates.append((originals.pop(None), path))
+                originals[grid_hash] = path
+    return duplicates, unresolved
+
+
+def get_puzzle_paths(puzzle_dir):
+
+    return sorted(
+        os.path.join(puzzle_dir, file_name) for file_name in os.listdir(puzzle_dir)
+        if file_name.endswith(f'.{core.FILE_EXTENSION}'))
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Find duplicate puzzles in a puzzle directory.')
+    parser.add_argument('puzzle_dir')
+    parser.add_argument('--move', metavar='DIR', help='Move duplicates into this directory.')
+    parser.add_argument('--workers', type=int, default=None)
+    arguments = parser.parse_args()
+
+    duplicate_pairs, unresolved_paths = find_duplicates(get_puzzle_paths(arguments.puzzle_dir), arguments.workers)
+    if arguments.move:
+        os.makedirs(arguments.move, exist_ok=True)
+    for duplicate_path, original_path in duplicate_pairs:
+        print(f'{duplicate_path} duplicates {original_path}')
+        if arguments.move:
+            shutil.move(duplicate_path, os.path.join(arguments.move, os.path.basename(duplicate_path)))
+    for unresolved_path in unresolved_paths:
+        print(f'{unresolved_path} could not be read and was skipped')
@@ -0,0 +1,253 @@
+"""Purpose: Stream puzzles from common nonogram formats into pycross puzzle files."""
+
+import argparse
+from concurrent import futures
+import json
+import os
+import xml.etree.ElementTree as ElementTree
+
+import core
+
+DEFAULT_COLORS = (
+    (40, 40, 40), (230, 80, 80), (160, 220, 220), (132, 45, 106), (38, 111, 97), (174, 151, 60), (70, 90, 200),
+    (240, 160, 40), (120, 180, 70))
+GRID_EMPTY_CHARACTERS = '.0- _'
+GRID_FILLED_CHARACTERS = '#Xx1'
+NON_HEADER_KEYS = ('catalogue', 'title', 'by', 'copyright', 'license', 'width', 'height')
+
+
+def get_default_palette(color_count):
+
+    if color_count > len(DEFAULT_COLORS):
+        raise ValueError(f'Only {len(DEFAULT_COLORS)} colors are supported for imported puzzles.')
+    return core.Palette(colors=DEFAULT_COLORS[:max(color_count, 1)])
+
+
+def get_key(lengths, color_index=1):
+
+    key = [core.KeyIsland(color_index, length) for length in lengths if length]
+    return key if key else [core.KeyIsland(1, 0)]
+
+
+def create_clues(rows, columns, palette):
+
+    if not rows or not columns:
+        raise ValueError('Puzzle is missing its row or column keys.')
+    return core.BoardClues((len(rows), len(columns)), palette, rows, columns)
+
+
+def create_board(rows, palette):
+
+    board = core.Board((len(rows), len(rows[0])), palette=palette)
+    for row_index, row in enumerate(rows):
+        board[row_index] = row
+    return board
+
+
+def iter_non_puzzles(path):
+
+    # .non files are keyword lines followed by one comma separated key per line, a file may hold several puzzles
+    def build(puzzle):
+
+        palette = get_default_palette(1)
+        if puzzle['goal'] is not None:
+            width = len(puzzle['columns'])
+            cells = [int(character) for character in puzzle['goal']]
+            return create_board([cells[index:index + width] for index in range(0, len(cells), width)], palette)
+        return create_clues(puzzle['rows'], puzzle['columns'], palette)
+
+    puzzle = None
+    section = None
+    with open(path, 'r') as import_file:
+        for line in import_file:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            keyword, _, value = line.partition(' ')
+            keyword = keyword.lower()
+            if keyword in NON_HEADER_KEYS or keyword in ('rows', 'columns', 'goal'):
+                section = None
+                if puzzle is None or (keyword in NON_HEADER_KEYS and puzzle['rows'] and puzzle['columns']):
+                    if puzzle is not None:
+                        yield build(puzzle)
+                    puzzle = {'rows': [], 'columns': [], 'goal': None}
+                if keyword in ('rows', 'columns'):
+                    section = keyword
+                elif keyword == 'goal':
+                    puzzle['goal'] = value.strip().strip('"')
+            elif section is not None:
+                puzzle[section].append(get_key([int(length) for length in line.split(',')]))
+
+    if puzzle is not None:
+        yield build(puzzle)
+
+
+def iter_grid_puzzles(path):
+
+    # Plain grids use one character per cell with puzzles separated by blank lines, digits select palette indices
+    def parse_character(character):
+
+        if character in GRID_EMPTY_CHARACTERS:
+            return 0
+        if character in GRID_FILLED_CHARACTERS:
+            return 1
+        if character.isdigit():
+            return int(character)
+        raise ValueError(f'Unknown grid character {character!r} in {path}.')
+
+    # Only line endings are stripped since spaces are empty cells, so only a truly empty line ends a puzzle
+    rows = []
+    with open(path, 'r') as import_file:
+        for line_number, line in enumerate(import_file, 1):
+            line = line.rstrip('\r\n')
+            if line.startswith(';'):
+                continue
+            if line:
+                if rows and len(line) != len(rows[0]):
+                    raise ValueError(
+                        f'Row on line {line_number} of {path} is {len(line)} cells wide, expected {len(rows[0])}.')
+                rows.append([parse_character(character) for character in line])
+            elif rows:
+                yield create_board(rows, get_default_palette(max(max(row) for row in rows)))
+                rows = []
+
+    if rows:
+        yield create_board(rows, get_default_palette(max(max(row) for row in rows)))
+
+
+def parse_hex_color(value):
+
+    value = value.strip().lstrip('#')
+    if len(value) == 3:
+        value = ''.join(character * 2 for character in value)
+    return tuple(int(value[index:index + 2], 16) for index in (0, 2, 4))
+
+
+def parse_xml_puzzle(element):
+
+    default_color = element.get('defaultcolor', 'black')
+    background_color = element.get('backgroundcolor', 'white')
+    color_indices = {background_color: 0}
+    colors = []
+    characters = {}
+    empty_color = (220, 220, 220)
+    for color_element in element.findall('color'):
+        name = color_element.get('name')
+        rgb = parse_hex_color(color_element.text)
+        if name == background_color:
+            empty_color = rgb
+            index = 0
+        else:
+            colors.append(rgb)
+            index = len(colors)
+            color_indices[name] = index
+        if color_element.get('char'):
+            characters[color_element.get('char')] = index
+    if default_color not in color_indices:
+        colors.append((40, 40, 40))
+        color_indices[default_color] = len(colors)
+    palette = core.Palette(colors=tuple(colors))
+    palette.empty_color = empty_color
+
+    for solution in element.findall('solution'):
+        image = solution.find('image')
+        if solution.get('type', 'goal') == 'goal' and image is not None:
+            rows = []
+            for line in image.text.split():
+                line = line.strip('|')
+                if line:
+                    rows.append([characters.get(character, 0) for character in line])
+            return create_board(rows, palette)
+
+    keys = {'rows': [], 'columns': []}
+    for clues_element in element.findall('clues'):
+        for line_element in clues_element.findall('line'):
+            key = []
+            for count_element in line_element.findall('count'):
+                color_index = color_indices[count_element.get('color', default_color)]
+                key.append(core.KeyIsland(color_index, int(count_element.text)))
+            keys[clues_element.get('type')].append(key if key else [core.KeyIsland(1, 0)])
+    return create_clues(keys['rows'], keys['columns'], palette)
+
+
+def iter_xml_puzzles(path):
+
+    # Puzzles are parsed as each element closes and then cleared so large puzzle sets never sit in memory
+    root = None
+    for event, element in ElementTree.iterparse(path, events=('start', 'end')):
+        if root is None and event == 'start':
+            root = element
+        elif event == 'end' and element.tag == 'puzzle':
+            yield parse_xml_puzzle(element)
+            element.clear()
+            root.clear()
+
+
+PARSERS = {
+    '.non': iter_non_puzzles,
+    '.xml': iter_xml_puzzles,
+    '.pbn': iter_xml_puzzles,
+    '.txt': iter_grid_puzzles,
+    '.grid': iter_grid_puzzles,
+}
+
+
+def iter_puzzles(path):
+
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in PARSERS:
+        raise ValueError(f'No importer available for {extension} files.')
+    return PARSERS[extension](path)
+
+
+def open_new_file(output_dir, name):
+
+    # Exclusive creation never overwrites earlier imports or files written concurrently by other workers
+    suffix = 0
+    while True:
+        puzzle_name = name if suffix == 0 else f'{name}_{suffix}'
+        try:
+            return open(os.path.join(output_dir, f'{puzzle_name}.{core.FILE_EXTENSION}'), 'x')
+        except FileExistsError:
+            suffix += 1
+
+
+def import_file(path, output_dir):
+
+    stem, extension = os.path.splitext(os.path.basename(path))
+    count = 0
+    for count, puzzle in enumerate(iter_puzzles(path), 1):
+        with open_new_file(output_dir, f'{stem}_{extension.lstrip(".").lower()}_{count:04d}') as save_file:
+            json.dump(puzzle.serialize(), save_file)
+    return count
+
+
+def import_files(paths, output_dir, workers=None):
+
+    # Returns puzzle counts per path along with the error of each path that failed to import
+    os.makedirs(output_dir, exist_ok=True)
+    counts = {}
+    failures = {}
+    with futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        jobs = {executor.submit(import_file, path, output_dir): path for path in paths}
+        for job in futures.as_completed(jobs):
+            try:
+                counts[jobs[job]] = job.result()
+            except (OSError, ValueError, KeyError, IndexError, TypeError) as error:
+                failures[jobs[job]] = error
+    return counts, failures
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Import nonogram collections into pycross puzzle files.')
+    parser.add_argument('output_dir')
+    parser.add_argument('paths', nargs='+')
+    parser.add_argument('--workers', type=int, default=None)
+    arguments = parser.parse_args()
+
+    import_counts, import_failures = import_files(arguments.paths, arguments.output_dir, arguments.workers)
+    for import_path, puzzle_count in import_counts.items():
+        print(f'{import_path}: {puzzle_count} puzzles')
+    for import_path, import_error in import_failures.items():
+        print(f'{import_path} could not be imported and was skipped: {import_error}')
@@ -0,0 +1,86 @@
+"""Purpose: Load test the local puzzle service and report throughput and latency percentiles."""
+
+import argparse
+import asyncio
+import json
+import time
+
+import service
+
+
+def get_request_body(endpoint, dimensions, colors):
+
+    if endpoint == 'generate':
+        return {'dimensions': dimensions, 'colors': colors}
+    puzzle = service.generate_puzzle(dimensions, colors, seed=0)
+    if endpoint == 'clues':
+        return {'puzzle': puzzle}
+    if endpoint == 'validate':
+        return {'puzzle': puzzle, 'grid': puzzle['rows']}
+    raise ValueError(f'Unknown endpoint {endpoint}.')
+
+
+async def run_client(host, port, request, request_count, latencies):
+
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(request_count):
+            start_time = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            content_length = 0
+            status_line = await reader.readline()
+            while True:
+                header_line = await reader.readline()
+                if header_line in (b'\r\n', b''):
+                    break
+                name, _, value = header_line.decode('latin-1').partition(':')
+                if name.lower() == 'content-length':
+                    content_length = int(value)
+            await reader.readexactly(content_length)
+            if b' 200 ' not in status_line:
+                raise RuntimeError(f'Request failed with {status_line.decode().strip()}')
+            latencies.append(time.perf_counter() - start_time)
+    finally:
+        writer.close()
+
+
+async def run_load_test(host, port, endpoint, connections, request_count, dimensions, colors):
+
+    body = json.dumps(get_request_body(endpoint, dimensions, colors)).encode()
+    request = (
+        f'POST /{endpoint} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n'
+        f'Content-Length: {len(body)}\r\n\r\n').encode('latin-1') + body
+
+    latencies = []
+    counts = [request_count // connections + int(index < request_count % connections) for index in range(connections)]
+    start_time = time.perf_counter()
+    await asyncio.gather(*(run_client(host, port, request, count, latencies) for count in counts if count))
+    elapsed = time.perf_counter() - start_time
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'requests_per_second': len(latencies) / elapsed,
+        'p50_ms': latencies[int(len(latencies) * 0.5)] * 1000,
+        'p99_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        'max_ms': latencies[-1] * 1000}
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Load test the local puzzle service.')
+    parser.add_argument('endpoint', choices=('generate', 'clues', 'validate'))
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--connections', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--dimensions', type=int, nargs=2, default=(25, 25))
+    parser.add_argument('--colors', type=int, default=1)
+    arguments = parser.parse_args()
+
+    results = asyncio.run(run_load_test(
+        arguments.host, arguments.port, arguments.endpoint, arguments.connections, arguments.requests,
+        arguments.dimensions, arguments.colors))
+    print(f"{results['requests']} requests, {results['requests_per_second']:.1f} req/s, "
+          f"p50 {results['p50_ms']:.2f}ms, p99 {results['p99_ms']:.2f}ms, max {results['max_ms']:.2f}ms")
@@ -0,0 +1,156 @@
+"""Purpose: Track player progress and mistakes incrementally from cell change events."""
+
+import time
+
+import core
+
+FILE_EXTENSION = 'pxsession'
+
+
+class SessionStats:
+
+    def __init__(self, clues, solution=None):
+
+        self.clues = clues
+        self.solution = None
+        # Mirror of the player's grid, kept current one cell change at a time
+        self.state = core.Board(clues.dimensions, clues.palette)
+        self.filled_cells = set()
+        self.crossed_cells = set()
+        self.correct_cells = set()
+        self.wrong_cells = set()
+        self.cross_mistakes = set()
+        # Lines touched since the last flush, only these are compared against their keys
+        self.dirty_lines = set()
+        self.solved_lines = {
+            (axis, index)
+            for axis, keys in ((core.BoardAxis.ROW, clues.rows), (core.BoardAxis.COLUMN, clues.columns))
+            for index, key in enumerate(keys) if key[0].length == 0}
+        self.line_times = {}
+        self.moves = 0
+        self.start_time = time.perf_counter()
+        self.elapsed_offset = 0.0
+        self.finish_time = None
+        if solution is not None:
+            self.set_solution(solution)
+
+    def set_solution(self, solution):
+
+        # Clue-only puzzles get their solution late, only cells the player has marked so far need checking
+        self.solution = solution
+        for position in self.filled_cells | self.crossed_cells:
+            self.check_cell(*position)
+
+    def check_cell(self, row_index, column_index):
+
+        position = (row_index, column_index)
+        index = self.state[row_index][column_index]
+        solution_index = self.solution[row_index][column_index]
+        for cells, is_member in (
+                (self.correct_cells, index and index == solution_index),
+                (self.wrong_cells, index and index != solution_index),
+                (self.cross_mistakes, position in self.crossed_cells and solution_index)):
+            if is_member:
+                cells.add(position)
+            else:
+                cells.discard(position)
+
+    def cell_changed(self, position, index, crossed):
+
+        row_index, column_index = position
+        self.state[row_index][column_index] = index
+        if index:
+            self.filled_cells.add(position)
+        else:
+            self.filled_cells.discard(position)
+        if crossed:
+            self.crossed_cells.add(position)
+        else:
+            self.crossed_cells.discard(position)
+        if self.solution is not None:
+            self.check_cell(row_index, column_index)
+        self.dirty_lines.add((core.BoardAxis.ROW, row_index))
+        self.dirty_lines.add((core.BoardAxis.COLUMN, column_index))
+
+    def record_move(self, positions=None):
+
+        self.moves += 1
+        self.flush()
+
+    def flush(self):
+
+        elapsed = self.get_elapsed()
+        for line in self.dirty_lines:
+            axis, index = line
+            if self.state.get_axis_key(index, axis) == self.clues.get_axis_key(index, axis):
+                if line not in self.solved_lines:
+                    self.solved_lines.add(line)
+                    self.line_times.setdefault(line, elapsed)
+            else:
+                self.solved_lines.discard(line)
+        self.dirty_lines.clear()
+
+    def finish(self):
+
+        self.flush()
+        if self.finish_time is None:
+            self.finish_time = time.perf_counter()
+
+    def get_elapsed(self):
+
+        end_time = time.perf_counter() if self.finish_time is None else self.finish_time
+        return self.elapsed_offset + end_time - self.start_time
+
+    def get_mistakes(self):
+
+        return self.wrong_cells | self.cross_mistakes
+
+    def get_summary(self):
+
+        self.flush()
+        elapsed = self.get_elapsed()
+        known = self.solution is not None
+        return {
+            'correct': len(self.correct_cells) if known else None,
+            'wrong': len(self.wrong_cells) if known else None,
+            'crossed_filled': len(self.cross_mistakes) if known else None,
+            'solved_lines': len(self.solved_lines),
+            'total_lines': sum(self.clues.dimensions),
+            # Average time the player needed per line, measured up to the most recent line solved
+            'seconds_per_line': max(self.line_times.values()) / len(self.line_times) if self.line_times else None,
+            'moves': self.moves,
+            'moves_per_minute': self.moves * 60 / elapsed if elapsed else 0.0,
+            'elapsed': elapsed,
+            'complete': self.finish_time is not None}
+
+    def format_summary(self):
+
+        summary = self.get_summary()
+        if summary['correct'] is None:
+            accuracy = 'Correct - | Wrong - | Crossed filled -'
+        else:
+            accuracy = (
+                f"Correct {summary['correct']} | Wrong {summary['wrong']} | "
+                f"Crossed filled {summary['crossed_filled']}")
+        line_time = '' if summary['seconds_per_line'] is None else f" ({summary['seconds_per_line']:.1f}s each)"
+        minutes, seconds = divmod(int(summary['elapsed']), 60)
+        return (
+            f"{accuracy} | Lines {summary['solved_lines']}/{summary['total_lines']}{line_time} | "
+            f"{summary['moves_per_minute']:.1f} moves/min | {minutes:02d}:{seconds:02d}")
+
+    def serialize(self):
+
+        return {
+            **self.get_summary(),
+            'line_times': [[axis.value, index, seconds] for (axis, index), seconds in sorted(
+                self.line_times.items(), key=lambda item: item[1])]}
+
+    def restore(self, data):
+
+        # Continues a saved session, the grid itself is restored through cell change events beforehand
+        self.flush()
+        self.moves = data['moves']
+        self.elapsed_offset = data['elapsed']
+        self.start_time = time.perf_counter()
+        self.finish_time = self.start_time if data.get('complete') else None
+        self.line_times = {(core.BoardAxis(axis), index): seconds for axis, index, seconds in data['line_times']}
@@ -0,0 +1,158 @@
+"""Purpose: Record board mouse input and replay it headlessly with latency measurements."""
+
+import argparse
+import json
+import os
+import statistics
+import struct
+import time
+
+from PySide6 import QtCore, QtGui, QtWidgets
+
+import core
+
+FILE_EXTENSION = 'pxrec'
+MAGIC = b'PXRC'
+HEADER_LENGTH = struct.Struct('<I')
+# Milliseconds since recording start, event type, changed button, held buttons, row, column, x, y
+RECORD = struct.Struct('<IBBBhhhh')
+EVENT_TYPES = (
+    QtCore.QEvent.Type.MouseButtonPress,
+    QtCore.QEvent.Type.MouseMove,
+    QtCore.QEvent.Type.MouseButtonRelease)
+
+
+class InputRecorder:
+
+    def __init__(self, board_widget):
+
+        self.board_widget = board_widget
+        self.header = {'puzzle': get_puzzle_data(board_widget), **get_state_data(board_widget)}
+        self.records = []
+        self.start_time = time.perf_counter()
+
+    def record(self, event):
+
+        # Positions are stored relative to the cell under the cursor so logs replay across layout changes
+        event_type = EVENT_TYPES.index(event.type())
+        position = event.position().toPoint()
+        cell = self.board_widget.get_cell_at_position(position)
+        if cell is None:
+            row, column, x, y = -1, -1, position.x(), position.y()
+        else:
+            row, column = cell.grid_index
+            x, y = position.x() - cell.x(), position.y() - cell.y()
+        elapsed = int((time.perf_counter() - self.start_time) * 1000)
+        buttons = event.buttons().value & 0xff
+        self.records.append((elapsed, event_type, event.button().value & 0xff, buttons, row, column, x, y))
+
+    def save(self, path):
+
+        header = dict(self.header, result=get_state_data(self.board_widget))
+        header_data = json.dumps(header).encode()
+        with open(path, 'wb') as save_file:
+            save_file.write(MAGIC)
+            save_file.write(HEADER_LENGTH.pack(len(header_data)))
+            save_file.write(header_data)
+            for record in self.records:
+                save_file.write(RECORD.pack(*record))
+
+
+def get_puzzle_data(board_widget):
+
+    # Puzzles loaded without their solution are written back the same way, even after it was reconstructed
+    return board_widget.clues.serialize() if board_widget.clue_only else board_widget.board.serialize()
+
+
+def get_state_data(board_widget):
+
+    return {
+        'state': board_widget.get_board_state().serialize(),
+        'cross': board_widget.get_cross_state().serialize()}
+
+
+def load_log(path):
+
+    with open(path, 'rb') as load_file:
+        if load_file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f'{path} is not an input recording.')
+        header_length, = HEADER_LENGTH.unpack(load_file.read(HEADER_LENGTH.size))
+        header = json.loads(load_file.read(header_length))
+        records = list(RECORD.iter_unpack(load_file.read()))
+    return header, records
+
+
+def replay_log(path, realtime=False):
+
+    # Returns per event latencies in milliseconds grouped by event type and whether the final state matched
+    import ui
+
+    header, records = load_log(path)
+    board, clues = core.deserialize_puzzle(header['puzzle'])
+    board_widget = ui.BoardWidget(board=board, clues=clues)
+    board_widget.show_complete_dialog = False
+    board_widget.set_board_state(
+        core.Board.deserialize(header['state']), core.BoardCrossState.deserialize(header['cross']))
+    board_widget.complete = board_widget.check_completion()
+    board_widget.show()
+    QtWidgets.QApplication.processEvents()
+
+    latencies = {event_type.name: [] for event_type in EVENT_TYPES}
+    start_time = time.perf_counter()
+    for elapsed, event_type, button, buttons, row, column, x, y in records:
+        if realtime:
+            time.sleep(max(0.0, elapsed / 1000 - (time.perf_counter() - start_time)))
+        if row < 0:
+            target = board_widget
+        else:
+            target = board_widget.cells[row][column]
+        local_position = QtCore.QPointF(x, y)
+        event = QtGui.QMouseEvent(
+            EVENT_TYPES[event_type],
+            local_position,
+            target.mapToGlobal(local_position),
+            QtCore.Qt.MouseButton(button),
+            QtCore.Qt.MouseButton(buttons),
+            QtCore.Qt.KeyboardModifier.NoModifier)
+        event_start = time.perf_counter()
+        QtWidgets.QApplication.sendEvent(target, event)
+        QtWidgets.QApplication.processEvents()
+        latencies[EVENT_TYPES[event_type].name].append((time.perf_counter() - event_start) * 1000)
+
+    matches = json.loads(json.dumps(get_state_data(board_widget))) == header['result']
+    board_widget.close()
+    return latencies, matches
+
+
+def summarize_latencies(latencies):
+
+    summary = {}
+    for event_name, values in latencies.items():
+        if not values:
+            continue
+        ordered = sorted(values)
+        summary[event_name] = {
+            'count': len(ordered),
+            'mean': statistics.fmean(ordered),
+            'p50': ordered[int(len(ordered) * 0.5)],
+            'p99': ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+            'max': ordered[-1]}
+    return summary
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Replay recorded board input and report latencies.')
+    parser.add_argument('paths', nargs='+')
+    parser.add_argument('--realtime', action='store_true', help='Keep the recorded timing between events.')
+    arguments = parser.parse_args()
+
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    app = QtWidgets.QApplication([])
+    for log_path in arguments.paths:
+        log_latencies, state_matches = replay_log(log_path, realtime=arguments.realtime)
+        print(f'{log_path}: final state {"matches" if state_matches else "DIFFERS from"} the recording')
+        for name, stats in summarize_latencies(log_latencies).items():
+            event_count = stats.pop('count')
+            timings = ', '.join(f'{key} {value:.2f}ms' for key, value in stats.items())
+            print(f'  {name}: count {event_count}, {timings}')
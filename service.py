@@ -0,0 +1,239 @@
+"""Purpose: Serve puzzle generation, keys and validation over a local asyncio HTTP/JSON service."""
+
+import argparse
+import asyncio
+from concurrent import futures
+import functools
+import inspect
+import json
+import multiprocessing
+import os
+
+import core
+import importers
+
+PUZZLE_DIR = os.path.join(os.getcwd(), 'puzzles')
+MAX_BODY_SIZE = 16 * 1024 * 1024
+STATUS_MESSAGES = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large',
+    500: 'Server Error'}
+
+
+class ServiceError(Exception):
+
+    def __init__(self, status, message):
+        super(ServiceError, self).__init__(message)
+
+        self.status = status
+
+    def __reduce__(self):
+
+        # Keeps the status when the error is raised in a worker process and pickled back
+        return self.__class__, (self.status, str(self))
+
+
+def generate_puzzle(dimensions, colors=1, palette=None, seed=None):
+
+    palette = importers.get_default_palette(colors) if palette is None else core.Palette.deserialize(palette)
+    board = core.Board(dimensions=tuple(dimensions), palette=palette)
+    board.randomize(seed=seed)
+    return board.serialize()
+
+
+def serialize_key(key):
+
+    return [[island.index, island.length] for island in key if island.length]
+
+
+def get_puzzle_clues(puzzle):
+
+    _, clues = core.deserialize_puzzle(puzzle)
+    return {
+        'rows': [serialize_key(key) for key in clues.rows],
+        'columns': [serialize_key(key) for key in clues.columns],
+        'encoded': clues.serialize()['clues']}
+
+
+def validate_grid(puzzle, grid):
+
+    _, clues = core.deserialize_puzzle(puzzle)
+    board = core.Board(dimensions=clues.dimensions, palette=clues.palette)
+    if len(grid) != clues.dimensions[0]:
+        raise ValueError("Passed grid does not match the puzzle's row dimension")
+    for row_index, row in enumerate(grid):
+        board[row_index] = list(row)
+    solved = clues.matches(board)
+    return {'solved': solved, 'matches_solution': solved and clues.check_solution(board)}
+
+
+def generate_request(data):
+
+    dimensions = data.get('dimensions', (10, 10))
+    if len(dimensions) != 2 or min(dimensions) < 1:
+        raise ServiceError(400, 'Dimensions must be two positive integers.')
+    return generate_puzzle(dimensions, data.get('colors', 1), data.get('palette'), data.get('seed'))
+
+
+def clues_request(data):
+
+    return get_puzzle_clues(data['puzzle'])
+
+
+def validate_request(data):
+
+    return validate_grid(data['puzzle'], data['grid'])
+
+
+def handle_request(function, body):
+
+    # Runs in a worker process, so even decoding a large body stays off the event loop. Every failure leaves as a
+    # ServiceError because arbitrary exceptions do not always survive the trip back through pickle
+    try:
+        data = json.loads(body) if body else {}
+    except json.JSONDecodeError as error:
+        raise ServiceError(400, f'Request body is not valid JSON: {error}')
+    try:
+        return function(data)
+    except ServiceError:
+        raise
+    except (KeyError, TypeError, ValueError) as error:
+        raise ServiceError(400, f'Invalid request: {error!r}')
+    except Exception as error:
+        raise ServiceError(500, repr(error))
+
+
+class PuzzleService:
+
+    def __init__(self, puzzle_dir=PUZZLE_DIR, workers=None):
+
+        self.puzzle_dir = puzzle_dir
+        # Spawned workers start clean instead of forking the running event loop and its sockets
+        self.executor = futures.ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        self.routes = {
+            ('POST', '/generate'): generate_request,
+            ('POST', '/clues'): clues_request,
+            ('POST', '/validate'): validate_request,
+            ('GET', '/puzzles'): self.list_puzzles,
+        }
+
+    async def run_cpu(self, function, *args, **kwargs):
+
+        # CPU heavy work always leaves the event loop for the process pool
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(function, *args, **kwargs))
+
+    async def list_puzzles(self, body):
+
+        names = await asyncio.to_thread(os.listdir, self.puzzle_dir)
+        return {'puzzles': sorted(name for name in names if name.endswith(f'.{core.FILE_EXTENSION}'))}
+
+    async def get_puzzle(self, name):
+
+        if name != os.path.basename(name) or not name.endswith(f'.{core.FILE_EXTENSION}'):
+            raise ServiceError(404, f'Unknown puzzle {name}.')
+        # Missing files are detected by the read itself so no file system call blocks the event loop
+        try:
+            return await asyncio.to_thread(read_puzzle, os.path.join(self.puzzle_dir, name))
+        except (FileNotFoundError, IsADirectoryError):
+            raise ServiceError(404, f'Unknown puzzle {name}.')
+
+    async def dispatch(self, method, path, body):
+
+        if path.startswith('/puzzles/'):
+            if method != 'GET':
+                raise ServiceError(405, f'{method} is not supported for {path}.')
+            return await self.get_puzzle(path[len('/puzzles/'):])
+        if (method, path) not in self.routes:
+            raise ServiceError(404, f'No endpoint for {method} {path}.')
+        route = self.routes[(method, path)]
+        if inspect.iscoroutinefunction(route):
+            return await route(body)
+        # CPU heavy routes get the raw body, decoding and all error handling happen in the worker
+        return await self.run_cpu(handle_request, route, body)
+
+    async def handle_connection(self, reader, writer):
+
+        # Connections are kept alive so clients can pipeline many requests over one socket
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    header_line = await reader.readline()
+                    if header_line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = header_line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                content_length = int(headers.get('content-length', 0))
+                if content_length > MAX_BODY_SIZE:
+                    # The unread body leaves the stream out of sync, so answer and close the connection
+                    writer.write(get_response(413, {'error': 'Request body is too large.'}, keep_alive=False))
+                    await writer.drain()
+                    break
+                body = await reader.readexactly(content_length) if content_length else b''
+
+                try:
+                    status, response = 200, await self.dispatch(method, path.split('?', 1)[0], body)
+                except ServiceError as error:
+                    status, response = error.status, {'error': str(error)}
+                except Exception as error:
+                    status, response = 500, {'error': repr(error)}
+
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                writer.write(get_response(status, response, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8765):
+
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        async with server:
+            await server.serve_forever()
+
+    def shutdown(self):
+
+        self.executor.shutdown(cancel_futures=True)
+
+
+def read_puzzle(path):
+
+    with open(path, 'rb') as load_file:
+        return json.load(load_file)
+
+
+def get_response(status, data, keep_alive=True):
+
+    body = json.dumps(data).encode()
+    header = (
+        f'HTTP/1.1 {status} {STATUS_MESSAGES.get(status, "Unknown")}\r\n'
+        f'Content-Type: application/json\r\n'
+        f'Content-Length: {len(body)}\r\n'
+        f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n')
+    return header.encode('latin-1') + body
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Run the local puzzle service.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--puzzle-dir', default=PUZZLE_DIR)
+    parser.add_argument('--workers', type=int, default=None)
+    arguments = parser.parse_args()
+
+    service = PuzzleService(arguments.puzzle_dir, arguments.workers)
+    try:
+        asyncio.run(service.serve(arguments.host, arguments.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.shutdown()
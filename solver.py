@@ -0,0 +1,467 @@
+"""Purpose: Solve picross puzzles from their row and column keys."""
+
+import argparse
+import collections
+from concurrent import futures
+import dataclasses
+import heapq
+import itertools
+import json
+import multiprocessing
+import time
+
+import core
+
+MAX_LINE_CACHE = 200000
+# Line results kept between analyses, reused when a line key meets the same domains again
+_line_cache = {}
+# Set by the portfolio pool initializer so every strategy can stop once one of them has an answer
+_cancel_event = None
+
+
+class SolveCancelled(Exception):
+    pass
+
+
+@dataclasses.dataclass(frozen=True)
+class Strategy:
+    name: str
+    line_order: str = 'queue'
+    branching: str = 'first'
+    probing: bool = False
+    filled_first: bool = False
+
+
+@dataclasses.dataclass
+class PortfolioResult:
+    strategy: str
+    solution: core.Board
+    solution_count: int
+    elapsed: float
+
+
+DEFAULT_STRATEGY = Strategy('queue')
+PORTFOLIO = (
+    DEFAULT_STRATEGY,
+    Strategy('slack', line_order='slack'),
+    Strategy('constrained', branching='constrained'),
+    Strategy('filled first', line_order='slack', branching='constrained', filled_first=True),
+    Strategy('probing', line_order='slack', branching='constrained', probing=True),
+)
+
+
+def get_full_domain(palette):
+
+    return (1 << (palette.size + 1)) - 1
+
+
+def create_domains(clues):
+
+    full_domain = get_full_domain(clues.palette)
+    return [[full_domain for _ in range(clues.dimensions[1])] for _ in range(clues.dimensions[0])]
+
+
+def solve_line(key, domains):
+
+    # Domains are bit masks of the values a cell can still take, bit 0 being the empty value.
+    # Returns the narrowed domains for the line or None when no arrangement of the key fits.
+    islands = [(island.index, island.length) for island in key if island.length]
+    size = len(domains)
+    count = len(islands)
+
+    runs = {}
+    for color in {color for color, _ in islands}:
+        bit = 1 << color
+        run = [0] * (size + 1)
+        for cell_index in range(size - 1, -1, -1):
+            run[cell_index] = run[cell_index + 1] + 1 if domains[cell_index] & bit else 0
+        runs[color] = run
+
+    # Islands of the same color need an empty cell between them
+    gaps = [int(j + 1 < count and islands[j + 1][0] == islands[j][0]) for j in range(count)]
+
+    def placement_end(cell_index, island_index):
+
+        color, length = islands[island_index]
+        end = cell_index + length
+        gap = gaps[island_index]
+        if end + gap > size or runs[color][cell_index] < length:
+            return None
+        if gap and not domains[end] & 1:
+            return None
+        return end + gap
+
+    forward = [[False] * (count + 1) for _ in range(size + 1)]
+    forward[0][0] = True
+    for cell_index in range(size + 1):
+        for island_index in range(count + 1):
+            if not forward[cell_index][island_index]:
+                continue
+            if cell_index < size and domains[cell_index] & 1:
+                forward[cell_index + 1][island_index] = True
+            if island_index < count:
+                end = placement_end(cell_index, island_index)
+                if end is not None:
+                    forward[end][island_index + 1] = True
+
+    if not forward[size][count]:
+        return None
+
+    backward = [[False] * (count + 1) for _ in range(size + 1)]
+    backward[size][count] = True
+    for cell_index in range(size - 1, -1, -1):
+        for island_index in range(count + 1):
+            if domains[cell_index] & 1 and backward[cell_index + 1][island_index]:
+                backward[cell_index][island_index] = True
+            elif island_index < count:
+                end = placement_end(cell_index, island_index)
+                backward[cell_index][island_index] = end is not None and backward[end][island_index + 1]
+
+    allowed = [0] * size
+    coverage = {color: [0] * (size + 1) for color in runs}
+    for cell_index in range(size):
+        for island_index in range(count + 1):
+            if not forward[cell_index][island_index]:
+                continue
+            if domains[cell_index] & 1 and backward[cell_index + 1][island_index]:
+                allowed[cell_index] |= 1
+            if island_index < count:
+                end = placement_end(cell_index, island_index)
+                if end is not None and backward[end][island_index + 1]:
+                    color, length = islands[island_index]
+                    coverage[color][cell_index] += 1
+                    coverage[color][cell_index + length] -= 1
+                    if gaps[island_index]:
+                        allowed[cell_index + length] |= 1
+
+    for color, changes in coverage.items():
+        bit = 1 << color
+        covered = 0
+        for cell_index in range(size):
+            covered += changes[cell_index]
+            if covered:
+                allowed[cell_index] |= bit
+
+    return allowed
+
+
+def get_line(domains, index, axis):
+
+    if axis == core.BoardAxis.ROW:
+        return domains[index]
+    return [row[index] for row in domains]
+
+
+def get_line_slack(clues, index, axis):
+
+    # Free cells left once every island and required gap is placed, low slack lines deduce the most
+    islands = [island for island in clues.get_axis_key(index, axis) if island.length]
+    gaps = sum(1 for island, next_island in zip(islands, islands[1:]) if island.index == next_island.index)
+    return clues.dimensions[1 - axis.value] - sum(island.length for island in islands) - gaps
+
+
+def propagate(clues, domains, lines=None, line_cache=None, strategy=None, cancel_event=None, undo_log=None):
+
+    # Narrows domains in place until no line changes, returns False on a contradiction. When an undo log is passed
+    # every overwritten (row, column, domain) is appended to it so the caller can roll the change back
+    strategy = DEFAULT_STRATEGY if strategy is None else strategy
+    if lines is None:
+        lines = [(core.BoardAxis.ROW, index) for index in range(clues.dimensions[0])]
+        lines += [(core.BoardAxis.COLUMN, index) for index in range(clues.dimensions[1])]
+    if strategy.line_order == 'slack':
+        queue = LineHeap(lambda line: get_line_slack(clues, line[1], line[0]))
+    else:
+        queue = LineQueue()
+    for line in lines:
+        queue.push(line)
+
+    while queue:
+        if cancel_event is not None and cancel_event.is_set():
+            raise SolveCancelled()
+        axis, index = queue.pop()
+        line = get_line(domains, index, axis)
+        key = clues.get_axis_key(index, axis)
+        if line_cache is None:
+            narrowed = solve_line(key, line)
+        else:
+            cache_key = (tuple((island.index, island.length) for island in key), tuple(line))
+            if cache_key not in line_cache:
+                if len(line_cache) >= MAX_LINE_CACHE:
+                    line_cache.clear()
+                line_cache[cache_key] = solve_line(key, line)
+            narrowed = line_cache[cache_key]
+        if narrowed is None:
+            return False
+        for position, (old_value, new_value) in enumerate(zip(line, narrowed)):
+            if old_value == new_value:
+                continue
+            row_index, column_index = (index, position) if axis == core.BoardAxis.ROW else (position, index)
+            if undo_log is not None:
+                undo_log.append((row_index, column_index, old_value))
+            domains[row_index][column_index] = new_value
+            crossing_axis = core.BoardAxis.COLUMN if axis == core.BoardAxis.ROW else core.BoardAxis.ROW
+            queue.push((crossing_axis, position))
+
+    return True
+
+
+class LineQueue:
+
+    def __init__(self):
+
+        self._lines = collections.deque()
+        self._queued = set()
+
+    def __bool__(self):
+
+        return bool(self._lines)
+
+    def push(self, line):
+
+        if line not in self._queued:
+            self._lines.append(line)
+            self._queued.add(line)
+
+    def pop(self):
+
+        line = self._lines.popleft()
+        self._queued.discard(line)
+        return line
+
+
+class LineHeap(LineQueue):
+
+    def __init__(self, priority_call):
+        super(LineHeap, self).__init__()
+
+        self._lines = []
+        self._priorities = {}
+        self.priority_call = priority_call
+
+    def push(self, line):
+
+        if line not in self._queued:
+            if line not in self._priorities:
+                self._priorities[line] = self.priority_call(line)
+            heapq.heappush(self._lines, (self._priorities[line], line[0].value, line[1]))
+            self._queued.add(line)
+
+    def pop(self):
+
+        _, axis_value, index = heapq.heappop(self._lines)
+        line = (core.BoardAxis(axis_value), index)
+        self._queued.discard(line)
+        return line
+
+
+def is_determined(domain):
+
+    return domain & (domain - 1) == 0
+
+
+def get_undetermined_cells(domains):
+
+    return [
+        (row_index, column_index)
+        for row_index, row in enumerate(domains)
+        for column_index, domain in enumerate(row)
+        if not is_determined(domain)]
+
+
+def domains_to_board(clues, domains):
+
+    board = core.Board(clues.dimensions, palette=clues.palette)
+    for row_index, row in enumerate(domains):
+        board[row_index] = [domain.bit_length() - 1 for domain in row]
+    return board
+
+
+def probe(clues, domains, strategy=None, cancel_event=None):
+
+    # Removes every cell value whose trial assignment propagates into a contradiction. Trials run on the domains
+    # themselves and are rolled back from an undo log, so each one only costs the cells it touches
+    changed = True
+    while changed:
+        changed = False
+        for row_index, column_index in get_undetermined_cells(domains):
+            domain = domains[row_index][column_index]
+            lines = [(core.BoardAxis.ROW, row_index), (core.BoardAxis.COLUMN, column_index)]
+            for value in range(domain.bit_length()):
+                if not domain & (1 << value):
+                    continue
+                undo_log = [(row_index, column_index, domains[row_index][column_index])]
+                domains[row_index][column_index] = 1 << value
+                try:
+                    feasible = propagate(
+                        clues, domains, lines, strategy=strategy, cancel_event=cancel_event, undo_log=undo_log)
+                finally:
+                    for undo_row, undo_column, old_value in reversed(undo_log):
+                        domains[undo_row][undo_column] = old_value
+                if not feasible:
+                    domain &= ~(1 << value)
+            if domain != domains[row_index][column_index]:
+                domains[row_index][column_index] = domain
+                if not domain or not propagate(clues, domains, lines, strategy=strategy, cancel_event=cancel_event):
+                    return False
+                changed = True
+    return True
+
+
+def choose_branch_cell(domains, undetermined, strategy):
+
+    if strategy.branching != 'constrained':
+        return undetermined[0]
+    # Fewest remaining values first, then the cell whose row and column are closest to solved
+    row_counts = collections.Counter(row_index for row_index, _ in undetermined)
+    column_counts = collections.Counter(column_index for _, column_index in undetermined)
+    return min(undetermined, key=lambda cell: (
+        bin(domains[cell[0]][cell[1]]).count('1'), row_counts[cell[0]] + column_counts[cell[1]]))
+
+
+def iter_solutions(clues, domains=None, strategy=None, cancel_event=None):
+
+    strategy = DEFAULT_STRATEGY if strategy is None else strategy
+    if domains is None:
+        domains = create_domains(clues)
+        if not propagate(clues, domains, strategy=strategy, cancel_event=cancel_event):
+            return
+
+    # Depth first search over an explicit stack of (domains, branch cell, values left to try) so the
+    # search depth of large boards is not bound by the recursion limit
+    stack = []
+    pending = domains
+    while True:
+        if pending is not None:
+            node, pending = pending, None
+            if not strategy.probing or probe(clues, node, strategy, cancel_event):
+                undetermined = get_undetermined_cells(node)
+                if not undetermined:
+                    yield domains_to_board(clues, node)
+                else:
+                    row_index, column_index = choose_branch_cell(node, undetermined, strategy)
+                    domain = node[row_index][column_index]
+                    values = [value for value in range(domain.bit_length()) if domain & (1 << value)]
+                    stack.append(
+                        (node, row_index, column_index, iter(values[::-1] if strategy.filled_first else values)))
+        if not stack:
+            return
+        node, row_index, column_index, values = stack[-1]
+        value = next(values, None)
+        if value is None:
+            stack.pop()
+            continue
+        branch = [list(row) for row in node]
+        branch[row_index][column_index] = 1 << value
+        lines = [(core.BoardAxis.ROW, row_index), (core.BoardAxis.COLUMN, column_index)]
+        if propagate(clues, branch, lines, strategy=strategy, cancel_event=cancel_event):
+            pending = branch
+
+
+def solve(clues):
+
+    return next(iter_solutions(clues), None)
+
+
+def count_solutions(clues, limit=2):
+
+    count = 0
+    for _ in iter_solutions(clues):
+        count += 1
+        if count >= limit:
+            break
+    return count
+
+
+def reconstruct(clues, limit=100):
+
+    # Walk alternative solutions looking for the stored solution hash. Without a hash only a unique solution is
+    # trusted, anything else returns None rather than a grid that would mark valid cells as mistakes
+    if clues.solution_hash is None:
+        solutions = list(itertools.islice(iter_solutions(clues), 2))
+        return solutions[0] if len(solutions) == 1 else None
+    for solution in itertools.islice(iter_solutions(clues), limit):
+        if clues.check_solution(solution):
+            return solution
+    return None
+
+
+def analyze(clues):
+
+    # Returns the cells line logic cannot determine, or None when the clues contradict each other
+    domains = create_domains(clues)
+    if not propagate(clues, domains, line_cache=_line_cache):
+        return None
+    return get_undetermined_cells(domains)
+
+
+def init_portfolio_worker(cancel_event):
+
+    global _cancel_event
+    _cancel_event = cancel_event
+
+
+def run_strategy(clues, strategy, limit):
+
+    solutions = []
+    try:
+        for solution in iter_solutions(clues, strategy=strategy, cancel_event=_cancel_event):
+            solutions.append(solution)
+            if len(solutions) >= limit:
+                break
+    except SolveCancelled:
+        return strategy.name, solutions, True
+    return strategy.name, solutions, False
+
+
+def solve_portfolio(clues, strategies=PORTFOLIO, check_uniqueness=False, workers=None, timeout=None):
+
+    # Races the strategies in a process pool and returns the first finished verdict, None on timeout or
+    # when every strategy failed.
+    # A solution_count of 2 means at least two solutions exist when uniqueness is checked.
+    limit = 2 if check_uniqueness else 1
+    context = multiprocessing.get_context('spawn')
+    cancel_event = context.Event()
+    executor = futures.ProcessPoolExecutor(
+        max_workers=workers or len(strategies),
+        mp_context=context,
+        initializer=init_portfolio_worker,
+        initargs=(cancel_event,))
+    start_time = time.perf_counter()
+    try:
+        jobs = [executor.submit(run_strategy, clues, strategy, limit) for strategy in strategies]
+        for job in futures.as_completed(jobs, timeout=timeout):
+            try:
+                name, solutions, cancelled = job.result()
+            except Exception:
+                continue  # A strategy that crashed has simply lost the race
+            if not cancelled:
+                return PortfolioResult(
+                    name, solutions[0] if solutions else None, len(solutions), time.perf_counter() - start_time)
+    except futures.TimeoutError:
+        pass
+    finally:
+        cancel_event.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+    return None
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Solve a puzzle file with a portfolio of strategies.')
+    parser.add_argument('path')
+    parser.add_argument('--unique', action='store_true', help='Also check whether the solution is unique.')
+    parser.add_argument('--timeout', type=float, default=None)
+    parser.add_argument('--workers', type=int, default=None)
+    arguments = parser.parse_args()
+
+    with open(arguments.path, 'r') as load_file:
+        _, puzzle_clues = core.deserialize_puzzle(json.load(load_file))
+    result = solve_portfolio(puzzle_clues, check_uniqueness=arguments.unique, workers=arguments.workers,
+                             timeout=arguments.timeout)
+    if result is None:
+        print('No strategy finished before the timeout.')
+    elif result.solution is None:
+        print(f'No solution exists ({result.strategy}, {result.elapsed:.2f}s).')
+    else:
+        verdict = {1: 'unique', 2: 'not unique'}.get(result.solution_count, '') if arguments.unique else 'solved'
+        print(f'Puzzle {verdict} by the {result.strategy} strategy in {result.elapsed:.2f}s.')
@@ -0,0 +1,147 @@
+"""Purpose: Regression tests for the board model, the clue encodings and the editing tools."""
+
+import json
+import random
+
+import pytest
+
+import core
+import importers
+
+
+def create_random_board(dimensions, colors=1, seed=0):
+
+    palette = importers.get_default_palette(colors)
+    board = core.Board(dimensions=dimensions, palette=palette)
+    board.randomize(seed=seed)
+    return board
+
+
+def test_varint_round_trip():
+
+    values = [0, 1, 127, 128, 300, 16383, 16384, 2 ** 35]
+    assert list(core.decode_varints(core.encode_varints(values))) == values
+
+
+def test_run_round_trip():
+
+    sequence = [0, 0, 1, 1, 1, 2, 0, 2, 2]
+    runs = core.encode_runs(sequence)
+    assert runs == [[0, 2], [1, 3], [2, 1], [0, 1], [2, 2]]
+    assert core.decode_runs(runs) == sequence
+
+
+def test_clues_round_trip():
+
+    for seed in range(20):
+        board = create_random_board((7, 11), colors=3, seed=seed)
+        clues = core.BoardClues.from_board(board)
+        loaded_board, loaded_clues = core.deserialize_puzzle(json.loads(json.dumps(clues.serialize())))
+        assert loaded_board is None
+        assert loaded_clues.rows == clues.rows and loaded_clues.columns == clues.columns
+        assert loaded_clues.matches(board) and loaded_clues.check_solution(board)
+
+
+def test_clues_decode_rejects_truncated_data():
+
+    clues = core.BoardClues.from_board(create_random_board((6, 7), colors=2, seed=4))
+    data = clues.encode()
+    for end in range(len(data)):
+        with pytest.raises(ValueError):
+            core.BoardClues.decode(data[:end], clues.dimensions, clues.palette)
+
+
+def test_clues_decode_rejects_trailing_data():
+
+    clues = core.BoardClues.from_board(create_random_board((6, 7), colors=2, seed=4))
+    for extra in (b'\x00', b'\x85'):
+        with pytest.raises(ValueError):
+            core.BoardClues.decode(clues.encode() + extra, clues.dimensions, clues.palette)
+
+
+def test_clues_decode_rejects_empty_palette():
+
+    clues = core.BoardClues.from_board(create_random_board((4, 4), seed=4))
+    with pytest.raises(ValueError):
+        core.BoardClues.decode(clues.encode(), clues.dimensions, core.Palette(colors=()))
+
+
+def test_run_length_board_matches_dense_board():
+
+    generator = random.Random(2)
+    dense = create_random_board((6, 9), colors=2, seed=2)
+    runs = core.RunLengthBoard.from_board(dense)
+    for _ in range(500):
+        row_index, column_index = generator.randrange(6), generator.randrange(9)
+        value = generator.randint(0, 2)
+        dense[row_index][column_index] = value
+        runs.set_value(row_index, column_index, value)
+        runs_row = runs.get_runs(row_index)
+        assert all(left[0] != right[0] for left, right in zip(runs_row, runs_row[1:]))
+    assert runs == dense and dense == runs
+    assert core.BoardClues.from_board(runs).rows == core.BoardClues.from_board(dense).rows
+    assert core.BoardClues.from_board(runs).columns == core.BoardClues.from_board(dense).columns
+
+
+def test_run_length_board_normalizes_loaded_runs():
+
+    data = {'dimensions': (1, 6), 'runs': [[[1, 2], [0, 0], [1, 2], [0, 2]]], 'palette': core.Palette().serialize()}
+    board = core.RunLengthBoard.deserialize(data)
+    assert board.get_runs(0) == [(1, 4), (0, 2)]
+    assert board.get_axis_key(0, core.BoardAxis.ROW) == [core.KeyIsland(1, 4)]
+    with pytest.raises(TypeError):
+        board[0][0] = 0
+
+
+def test_flood_fill_matches_breadth_first_fill():
+
+    for seed in range(20):
+        board = create_random_board((9, 12), seed=seed)
+        start = (seed % 9, seed % 12)
+        target = board[start[0]][start[1]]
+        expected = {start}
+        frontier = [start]
+        while frontier:
+            row_index, column_index = frontier.pop()
+            for neighbour in (
+                    (row_index - 1, column_index), (row_index + 1, column_index),
+                    (row_index, column_index - 1), (row_index, column_index + 1)):
+                if (0 <= neighbour[0] < 9 and 0 <= neighbour[1] < 12 and neighbour not in expected
+                        and board[neighbour[0]][neighbour[1]] == target):
+                    expected.add(neighbour)
+                    frontier.append(neighbour)
+
+        changed = board.flood_fill(start, 1 - target)
+        assert set(changed) == expected and len(changed) == len(expected)
+
+
+def test_draw_line_connects_endpoints():
+
+    board = core.Board(dimensions=(5, 8))
+    changed = board.draw_line((4, 0), (0, 7), 1)
+    assert changed[0] == (4, 0) and changed[-1] == (0, 7)
+    # One cell per column along the longer axis, each step moves at most one cell
+    assert len(changed) == 8
+    assert all(
+        abs(left[0] - right[0]) <= 1 and abs(left[1] - right[1]) <= 1 for left, right in zip(changed, changed[1:]))
+    assert board.draw_line((4, 0), (0, 7), 1) == []
+
+
+def test_draw_rectangle_outline_and_fill():
+
+    board = core.Board(dimensions=(5, 6))
+    changed = board.draw_rectangle((3, 4), (1, 1), 1)
+    assert sorted(changed) == sorted(set(changed))
+    assert [row[1:5] for row in board._data[1:4]] == [[1, 1, 1, 1], [1, 0, 0, 1], [1, 1, 1, 1]]
+    assert board.draw_rectangle((1, 1), (3, 4), 1, filled=True) == [(2, 2), (2, 3)]
+
+
+def test_paste_region_clips_to_board():
+
+    board = create_random_board((6, 6), seed=3)
+    region = board.get_region((0, 0), (2, 2))
+    target = core.Board(dimensions=(6, 6))
+    changed = target.paste_region(region, (4, 4))
+    assert all(row_index < 6 and column_index < 6 for row_index, column_index in changed)
+    assert target.get_region((4, 4), (5, 5)) == [row[:2] for row in region[:2]]
+    assert target.paste_region(region, (4, 4)) == []
@@ -0,0 +1,73 @@
+"""Purpose: Regression tests for canonical puzzle hashing and duplicate detection."""
+
+import json
+
+import core
+import dedupe
+import importers
+
+
+def create_random_board(dimensions, colors=1, seed=0):
+
+    palette = importers.get_default_palette(colors)
+    board = core.Board(dimensions=dimensions, palette=palette)
+    board.randomize(seed=seed)
+    return board
+
+
+def test_canonical_hash_ignores_symmetry_and_color_order():
+
+    board = create_random_board((4, 6), colors=3, seed=5)
+    board_hash = board.get_canonical_grid_hash()
+    clues_hash = core.BoardClues.from_board(board).get_canonical_hash()
+    assert board.get_canonical_hash() == clues_hash
+    for rows in board.iter_symmetries():
+        symmetry = core.Board(dimensions=(len(rows), len(rows[0])), palette=board.palette)
+        for row_index, row in enumerate(rows):
+            symmetry[row_index] = row
+        assert symmetry.get_canonical_grid_hash() == board_hash
+        assert core.BoardClues.from_board(symmetry).get_canonical_hash() == clues_hash
+
+    # Swapping the first two palette entries along with their cells describes the same puzzle
+    colors = board.palette.colors
+    recolored = core.Board(dimensions=board.dimensions, palette=core.Palette((colors[1], colors[0], colors[2])))
+    for row_index, row in enumerate(board):
+        recolored[row_index] = [{1: 2, 2: 1}.get(value, value) for value in row]
+    assert recolored.get_canonical_grid_hash() == board_hash
+    assert core.BoardClues.from_board(recolored).get_canonical_hash() == clues_hash
+
+
+def test_find_duplicates_keeps_different_pictures(tmp_path):
+
+    # Every permutation matrix has the same keys, the identity and a three cycle are not symmetries of each other
+    identity = core.Board(dimensions=(3, 3))
+    cycle = core.Board(dimensions=(3, 3))
+    for index in range(3):
+        identity[index][index] = 1
+        cycle[index][(index + 1) % 3] = 1
+    mirrored = core.Board(dimensions=(3, 3))
+    for row_index, row in enumerate(identity):
+        mirrored[row_index] = row[::-1]
+    puzzles = {
+        'a_clues': core.BoardClues.from_board(identity).serialize(),
+        'b_identity': identity.serialize(),
+        'c_cycle': cycle.serialize(),
+        'd_mirrored': mirrored.serialize(),
+        'e_clues': core.BoardClues.from_board(cycle).serialize()}
+    paths = {}
+    for name, data in puzzles.items():
+        paths[name] = str(tmp_path / f'{name}.{core.FILE_EXTENSION}')
+        with open(paths[name], 'w') as save_file:
+            json.dump(data, save_file)
+    # Clue data cut short must be reported rather than crash the worker
+    broken_puzzle = dict(puzzles['e_clues'], clues='AQ==')
+    broken_path = str(tmp_path / f'f_broken.{core.FILE_EXTENSION}')
+    with open(broken_path, 'w') as save_file:
+        json.dump(broken_puzzle, save_file)
+
+    duplicates, unresolved = dedupe.find_duplicates(dedupe.get_puzzle_paths(str(tmp_path)), workers=1)
+    assert sorted(duplicates) == sorted([
+        (paths['a_clues'], paths['b_identity']),
+        (paths['d_mirrored'], paths['b_identity']),
+        (paths['e_clues'], paths['b_identity'])])
+    assert unresolved == [broken_path]
@@ -0,0 +1,58 @@
+"""Purpose: Regression tests for the nonogram importers."""
+
+import os
+
+import pytest
+
+import core
+import importers
+import solver
+
+
+def test_grid_import_keeps_blank_edges(tmp_path):
+
+    path = tmp_path / 'grid.txt'
+    path.write_text(' #\n##\n\n# \r\n  \r\n')
+    boards = list(importers.iter_grid_puzzles(str(path)))
+    assert [board._data for board in boards] == [[[0, 1], [1, 1]], [[1, 0], [0, 0]]]
+
+    path.write_text('##\n###\n')
+    with pytest.raises(ValueError, match='line 2'):
+        list(importers.iter_grid_puzzles(str(path)))
+
+
+def test_non_import_without_goal(tmp_path):
+
+    path = tmp_path / 'set.non'
+    path.write_text('width 2\nheight 2\nrows\n2\n1\ncolumns\n1\n2\n')
+    clues, = importers.iter_non_puzzles(str(path))
+    assert isinstance(clues, core.BoardClues)
+    assert solver.count_solutions(clues) == 1
+
+
+def test_imports_never_overwrite(tmp_path):
+
+    for directory in ('a', 'b'):
+        os.makedirs(tmp_path / directory)
+        (tmp_path / directory / 'set.non').write_text('rows\n1\ncolumns\n1\n')
+    output_dir = tmp_path / 'out'
+    os.makedirs(output_dir)
+    importers.import_file(str(tmp_path / 'a' / 'set.non'), str(output_dir))
+    importers.import_file(str(tmp_path / 'b' / 'set.non'), str(output_dir))
+    assert len(os.listdir(output_dir)) == 2
+
+
+def test_import_files_reports_failed_paths(tmp_path):
+
+    good_path = tmp_path / 'good.txt'
+    good_path.write_text('#.\n.#\n')
+    bad_path = tmp_path / 'bad.txt'
+    bad_path.write_text('##\n###\n')
+    missing_path = tmp_path / 'missing.txt'
+    output_dir = tmp_path / 'out'
+    counts, failures = importers.import_files(
+        [str(good_path), str(bad_path), str(missing_path)], str(output_dir), workers=1)
+    assert counts == {str(good_path): 1}
+    assert sorted(failures) == sorted([str(bad_path), str(missing_path)])
+    assert isinstance(failures[str(bad_path)], ValueError)
+    assert os.listdir(output_dir) == [f'good_txt_0001.{core.FILE_EXTENSION}']
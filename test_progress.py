@@ -0,0 +1,98 @@
+"""Purpose: Regression tests for the incremental session statistics."""
+
+import random
+
+import core
+import progress
+
+
+def create_board():
+
+    board = core.Board(dimensions=(2, 3))
+    board[0] = [1, 1, 0]
+    board[1] = [0, 0, 1]
+    return board
+
+
+def test_stats_follow_cell_changes():
+
+    board = create_board()
+    stats = progress.SessionStats(core.BoardClues.from_board(board), solution=board)
+    stats.cell_changed((0, 0), 1, False)
+    stats.cell_changed((0, 2), 1, False)
+    stats.cell_changed((1, 2), 0, True)
+    stats.record_move()
+    summary = stats.get_summary()
+    assert (summary['correct'], summary['wrong'], summary['crossed_filled']) == (1, 1, 1)
+    assert stats.get_mistakes() == {(0, 2), (1, 2)}
+    # Both marked columns already match their single cell keys, even though one of them is wrong
+    assert summary['solved_lines'] == 2 and summary['moves'] == 1
+
+    # Fixing the row solves it along with the columns it completes
+    stats.cell_changed((0, 2), 0, False)
+    stats.cell_changed((0, 1), 1, False)
+    stats.cell_changed((1, 2), 1, False)
+    stats.record_move()
+    assert stats.get_mistakes() == set()
+    assert stats.get_summary()['solved_lines'] == 5
+
+    stats.cell_changed((0, 0), 0, False)
+    stats.record_move()
+    assert stats.get_summary()['solved_lines'] == 3
+
+
+def test_stats_match_full_recount():
+
+    # Random edits must leave the incremental sets equal to counting the whole grid again
+    board = core.Board(dimensions=(6, 7), palette=core.Palette(((200, 0, 0), (0, 0, 200))))
+    board.randomize(seed=5)
+    clues = core.BoardClues.from_board(board)
+    stats = progress.SessionStats(clues, solution=board)
+    state = core.Board(board.dimensions, board.palette)
+    crossed = set()
+    generator = random.Random(5)
+    for _ in range(300):
+        position = (generator.randrange(6), generator.randrange(7))
+        index = generator.randint(0, 2)
+        cross = not index and generator.random() < 0.5
+        state[position[0]][position[1]] = index
+        crossed.discard(position)
+        if cross:
+            crossed.add(position)
+        stats.cell_changed(position, index, cross)
+        if generator.random() < 0.3:
+            stats.record_move()
+
+    cells = [(row_index, column_index) for row_index in range(6) for column_index in range(7)]
+    assert stats.correct_cells == {cell for cell in cells if state[cell[0]][cell[1]] and state[cell[0]][
+        cell[1]] == board[cell[0]][cell[1]]}
+    assert stats.wrong_cells == {cell for cell in cells if state[cell[0]][cell[1]] and state[cell[0]][
+        cell[1]] != board[cell[0]][cell[1]]}
+    assert stats.cross_mistakes == {cell for cell in crossed if board[cell[0]][cell[1]]}
+    solved_lines = {
+        (axis, index) for axis, count in ((core.BoardAxis.ROW, 6), (core.BoardAxis.COLUMN, 7))
+        for index in range(count) if state.get_axis_key(index, axis) == clues.get_axis_key(index, axis)}
+    assert stats.get_summary()['solved_lines'] == len(solved_lines)
+
+
+def test_late_solution_and_restore():
+
+    board = create_board()
+    stats = progress.SessionStats(core.BoardClues.from_board(board))
+    stats.cell_changed((0, 0), 1, False)
+    stats.cell_changed((1, 0), 0, True)
+    stats.record_move()
+    assert stats.get_summary()['correct'] is None
+    assert 'Correct -' in stats.format_summary()
+
+    # Clue-only puzzles check the cells marked so far once the solution arrives
+    stats.set_solution(board)
+    assert stats.correct_cells == {(0, 0)} and stats.get_mistakes() == set()
+
+    saved = stats.serialize()
+    restored = progress.SessionStats(core.BoardClues.from_board(board), solution=board)
+    restored.cell_changed((0, 0), 1, False)
+    restored.cell_changed((1, 0), 0, True)
+    restored.restore(saved)
+    assert restored.get_summary()['moves'] == 1 and restored.get_elapsed() >= saved['elapsed']
+    assert restored.line_times == stats.line_times
@@ -0,0 +1,53 @@
+"""Purpose: Regression tests for recording and replaying board input."""
+
+import pytest
+
+QtCore = pytest.importorskip('PySide6.QtCore')
+QtGui = pytest.importorskip('PySide6.QtGui')
+QtWidgets = pytest.importorskip('PySide6.QtWidgets')
+
+import core  # noqa: E402
+import importers  # noqa: E402
+import replay  # noqa: E402
+import ui  # noqa: E402
+
+
+def create_random_board(dimensions, colors=1, seed=0):
+
+    palette = importers.get_default_palette(colors)
+    board = core.Board(dimensions=dimensions, palette=palette)
+    board.randomize(seed=seed)
+    return board
+
+
+def test_replayed_drag_matches_recording(qt_app, tmp_path):
+
+    board_widget = ui.BoardWidget(create_random_board((5, 5), seed=4))
+    board_widget.show_complete_dialog = False
+    board_widget.show()
+    qt_app.processEvents()
+    board_widget.recorder = replay.InputRecorder(board_widget)
+
+    # Drag along the first row, back one cell, then release, the pressed cell grabs the mouse like it would live
+    start_cell = board_widget.cells[0][0]
+    positions = [
+        board_widget.cells[0][column_index].geometry().center() - start_cell.pos()
+        for column_index in (0, 1, 2, 3, 2)]
+    buttons = QtCore.Qt.MouseButton.LeftButton
+    no_button = QtCore.Qt.MouseButton.NoButton
+    for event_type, position, button, held in (
+            [(QtCore.QEvent.Type.MouseButtonPress, positions[0], buttons, buttons)]
+            + [(QtCore.QEvent.Type.MouseMove, position, no_button, buttons) for position in positions[1:]]
+            + [(QtCore.QEvent.Type.MouseButtonRelease, positions[-1], buttons, no_button)]):
+        local_position = QtCore.QPointF(position)
+        QtWidgets.QApplication.sendEvent(start_cell, QtGui.QMouseEvent(
+            event_type, local_position, start_cell.mapToGlobal(local_position), button, held,
+            QtCore.Qt.KeyboardModifier.NoModifier))
+    assert [cell.index for cell in board_widget.cells[0]] == [1, 1, 1, 0, 0]
+
+    log_path = str(tmp_path / f'drag.{replay.FILE_EXTENSION}')
+    board_widget.recorder.save(log_path)
+    board_widget.close()
+    latencies, matches = replay.replay_log(log_path)
+    assert matches
+    assert len(latencies['MouseMove']) == 4
@@ -0,0 +1,103 @@
+"""Purpose: Regression tests for the puzzle service endpoints and their error handling."""
+
+import asyncio
+import base64
+import json
+
+import pytest
+
+import core
+import service
+
+
+@pytest.fixture(scope='module')
+def puzzle_service(tmp_path_factory):
+
+    puzzle_dir = tmp_path_factory.mktemp('puzzles')
+    board = core.Board(dimensions=(4, 5))
+    board.randomize(seed=1)
+    (puzzle_dir / f'stored.{core.FILE_EXTENSION}').write_text(json.dumps(board.serialize()))
+    puzzle_service = service.PuzzleService(str(puzzle_dir), workers=1)
+    yield puzzle_service
+    puzzle_service.shutdown()
+
+
+def send_requests(puzzle_service, requests):
+
+    # Sends (method, path, body) requests over one kept alive connection and returns (status, data) pairs
+    async def run():
+
+        server = await asyncio.start_server(puzzle_service.handle_connection, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        responses = []
+        for method, path, body in requests:
+            body = body if isinstance(body, bytes) else json.dumps(body).encode()
+            writer.write(f'{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n'.encode('latin-1') + body)
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            headers = {}
+            while True:
+                header_line = await reader.readline()
+                if header_line in (b'\r\n', b''):
+                    break
+                name, _, value = header_line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            responses.append((status, json.loads(await reader.readexactly(int(headers['content-length'])))))
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return responses
+
+    return asyncio.run(run())
+
+
+def test_generate_clues_and_validate(puzzle_service):
+
+    (status, puzzle), = send_requests(puzzle_service, [('POST', '/generate', {'dimensions': [6, 4], 'seed': 2})])
+    assert status == 200
+    (clue_status, clues), (valid_status, result) = send_requests(puzzle_service, [
+        ('POST', '/clues', {'puzzle': puzzle}),
+        ('POST', '/validate', {'puzzle': puzzle, 'grid': puzzle['rows']})])
+    assert clue_status == 200 and len(clues['rows']) == 6 and len(clues['columns']) == 4
+    assert valid_status == 200 and result == {'solved': True, 'matches_solution': True}
+
+
+def test_bad_requests_are_rejected(puzzle_service):
+
+    board = core.Board(dimensions=(3, 3))
+    clue_puzzle = core.BoardClues.from_board(board).serialize()
+    clue_puzzle['clues'] = base64.b64encode(b'\x01').decode('ascii')
+    responses = send_requests(puzzle_service, [
+        ('POST', '/clues', b'{not json'),
+        ('POST', '/clues', {}),
+        ('POST', '/clues', {'puzzle': clue_puzzle}),
+        ('POST', '/generate', {'dimensions': [0, 4]}),
+        ('POST', '/validate', {'puzzle': board.serialize(), 'grid': [[0]]})])
+    assert [status for status, _ in responses] == [400] * 5
+    assert all('error' in data for _, data in responses)
+
+
+def test_stored_puzzles(puzzle_service):
+
+    responses = send_requests(puzzle_service, [
+        ('GET', '/puzzles', b''),
+        ('GET', f'/puzzles/stored.{core.FILE_EXTENSION}', b''),
+        ('GET', f'/puzzles/missing.{core.FILE_EXTENSION}', b''),
+        ('GET', f'/puzzles/..%2Fstored.{core.FILE_EXTENSION}', b''),
+        ('POST', f'/puzzles/stored.{core.FILE_EXTENSION}', b''),
+        ('GET', '/unknown', b'')])
+    assert responses[0] == (200, {'puzzles': [f'stored.{core.FILE_EXTENSION}']})
+    assert responses[1][0] == 200 and responses[1][1]['dimensions'] == [4, 5]
+    assert [status for status, _ in responses[2:]] == [404, 404, 405, 404]
+
+
+def test_unexpected_worker_errors_become_server_errors():
+
+    def fail(data):
+
+        raise ZeroDivisionError('boom')
+
+    with pytest.raises(service.ServiceError) as error:
+        service.handle_request(fail, b'{}')
+    assert error.value.status == 500
@@ -0,0 +1,84 @@
+"""Purpose: Regression tests for the line solver and the puzzle search."""
+
+import itertools
+import random
+
+import core
+import importers
+import solver
+
+
+def create_random_board(dimensions, colors=1, seed=0):
+
+    palette = importers.get_default_palette(colors)
+    board = core.Board(dimensions=dimensions, palette=palette)
+    board.randomize(seed=seed)
+    return board
+
+
+def create_permutation_board(size, seed=0):
+
+    # One filled cell per row and column, line logic alone cannot place any of them so the search goes deep
+    columns = list(range(size))
+    random.Random(seed).shuffle(columns)
+    board = core.Board(dimensions=(size, size))
+    for row_index, column_index in enumerate(columns):
+        board[row_index][column_index] = 1
+    return board
+
+
+def test_solve_line_matches_brute_force():
+
+    generator = random.Random(1)
+    for _ in range(300):
+        size = generator.randint(1, 7)
+        color_count = generator.randint(1, 2)
+        key = core.get_sequence_key([generator.randint(0, color_count) for _ in range(size)])
+        full_domain = (1 << (color_count + 1)) - 1
+        domains = [full_domain if generator.random() < 0.7 else generator.randint(1, full_domain) for _ in range(size)]
+
+        expected = [0] * size
+        for line in itertools.product(range(color_count + 1), repeat=size):
+            fits = all(domain & (1 << value) for domain, value in zip(domains, line))
+            if fits and core.get_sequence_key(line) == key:
+                expected = [mask | (1 << value) for mask, value in zip(expected, line)]
+        narrowed = solver.solve_line(key, domains)
+        assert narrowed == (expected if any(expected) else None)
+
+
+def test_reconstruct_finds_stored_solution():
+
+    board = create_random_board((8, 8), colors=2, seed=3)
+    clues = core.BoardClues.from_board(board)
+    assert solver.reconstruct(clues).get_solution_hash() == board.get_solution_hash()
+
+
+def test_reconstruct_only_returns_verified_solutions():
+
+    # Two permutation cells on a 2x2 board can sit on either diagonal
+    board = create_permutation_board(2)
+    clues = core.BoardClues.from_board(board)
+    clues.solution_hash = None
+    assert solver.reconstruct(clues) is None
+    clues.solution_hash = 'not a solution hash'
+    assert solver.reconstruct(clues) is None
+    clues.solution_hash = board.get_solution_hash()
+    assert solver.reconstruct(clues) == board
+
+
+def test_deep_search_does_not_recurse():
+
+    # 60x60 permutation puzzles used to exceed the recursion limit of the nested generator search
+    board = create_permutation_board(60)
+    clues = core.BoardClues.from_board(board)
+    assert clues.matches(solver.solve(clues))
+
+
+def test_portfolio_strategies_agree():
+
+    for seed in range(10):
+        clues = core.BoardClues.from_board(create_random_board((6, 5), colors=2, seed=seed))
+        expected = {solution.get_solution_hash() for solution in solver.iter_solutions(clues)}
+        for strategy in solver.PORTFOLIO:
+            found = {solution.get_solution_hash() for solution in solver.iter_solutions(clues, strategy=strategy)}
+            assert found == expected
@@ -0,0 +1,50 @@
+"""Purpose: Regression tests for puzzle thumbnail rendering and the thumbnail cache."""
+
+import os
+
+import pytest
+
+QtGui = pytest.importorskip('PySide6.QtGui')
+
+import core  # noqa: E402
+import thumbnails  # noqa: E402
+
+
+def test_blur_hides_small_boards():
+
+    for size in range(1, 40):
+        blur_size = thumbnails.get_blur_size((size, size))
+        assert 1 <= blur_size <= thumbnails.BLUR_SIZE
+        assert blur_size == 1 or blur_size <= size / 2
+
+
+def test_unsolved_thumbnail_does_not_reveal_solution(qt_app):
+
+    # Mirrored pictures of the same small board blur into the same thumbnail when only a single pixel survives
+    board = core.Board(dimensions=(4, 4))
+    board[0] = [1, 1, 0, 0]
+    mirrored = core.Board(dimensions=(4, 4))
+    mirrored[0] = [0, 0, 1, 1]
+    assert thumbnails.render_thumbnail(board.serialize()) == thumbnails.render_thumbnail(mirrored.serialize())
+    assert thumbnails.render_thumbnail(board.serialize(), reveal=True) != thumbnails.render_thumbnail(
+        mirrored.serialize(), reveal=True)
+
+
+def test_cache_evicts_least_recently_used(qt_app, tmp_path):
+
+    cache = thumbnails.ThumbnailCache(str(tmp_path), max_entries=2)
+    image = QtGui.QImage(4, 4, QtGui.QImage.Format.Format_RGB32)
+    image.fill(0)
+    cache.put('first', image)
+    cache.put('second', image)
+    assert cache.get('first') is not None
+    cache.put('third', image)
+    assert cache.get('second') is None and not os.path.exists(cache.get_path('second'))
+    assert cache.get('first') is not None and cache.get('third') is not None
+
+    # A new cache picks up the recency order from the file modification times
+    os.utime(cache.get_path('first'), (1, 1))
+    os.utime(cache.get_path('third'), (2, 2))
+    reopened = thumbnails.ThumbnailCache(str(tmp_path), max_entries=2)
+    reopened.put('fourth', image)
+    assert sorted(name for name in os.listdir(tmp_path)) == ['fourth.png', 'third.png']
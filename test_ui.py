@@ -0,0 +1,144 @@
+"""Purpose: Regression tests for the board widgets and their background helpers."""
+
+from concurrent import futures
+import time
+
+import pytest
+
+QtCore = pytest.importorskip('PySide6.QtCore')
+QtGui = pytest.importorskip('PySide6.QtGui')
+QtWidgets = pytest.importorskip('PySide6.QtWidgets')
+
+import core  # noqa: E402
+import ui  # noqa: E402
+
+
+def wait_for(qt_app, condition, timeout=30):
+
+    end_time = time.perf_counter() + timeout
+    while not condition() and time.perf_counter() < end_time:
+        qt_app.processEvents()
+        time.sleep(0.01)
+    return condition()
+
+
+def test_edit_analyzer_reports_and_shuts_down(qt_app):
+
+    board = core.Board(dimensions=(3, 3))
+    for index in range(3):
+        board[index][index] = 1
+    board_widget = ui.BoardWidget(board)
+    board_widget.set_board_state(board)
+    analyzer = ui.EditAnalyzer(board_widget)
+    messages = []
+    analyzer.status_changed.connect(messages.append)
+    try:
+        assert wait_for(qt_app, lambda: messages)
+        # Every permutation of three cells has the same keys, so no cell can be deduced
+        assert messages == ['9 cells cannot be deduced from the keys.']
+        assert board_widget.highlighted_cells == {(row, column) for row in range(3) for column in range(3)}
+
+        # Worker errors and cancelled analyses arrive through the done callback without raising
+        failed, cancelled = futures.Future(), futures.Future()
+        failed.set_exception(RuntimeError('worker died'))
+        cancelled.cancel()
+        analyzer.analysis_done(failed)
+        analyzer.analysis_done(cancelled)
+        assert wait_for(qt_app, lambda: len(messages) > 1)
+        assert messages[1].startswith('The puzzle keys could not be analyzed') and not board_widget.highlighted_cells
+    finally:
+        analyzer.shutdown()
+
+    # Results arriving after shutdown no longer reach the board
+    analyzer.analysis_ready.emit([(0, 0)])
+    qt_app.processEvents()
+    assert len(messages) == 2
+
+
+def test_complete_event_clears_crosses(qt_app):
+
+    board = core.Board(dimensions=(4, 4))
+    board.randomize(seed=2)
+    cross_state = core.BoardCrossState((4, 4))
+    for row_index, row in enumerate(board):
+        cross_state[row_index] = [not value for value in row]
+    board_widget = ui.BoardWidget(board)
+    board_widget.show_complete_dialog = False
+    board_widget.set_board_state(board, cross_state)
+    board_widget.complete_event()
+    assert board_widget.get_board_state() == board
+    assert not any(any(row) for row in board_widget.get_cross_state())
+    assert all(cell.frameShape() == QtWidgets.QFrame.Shape.NoFrame for row in board_widget.cells for cell in row)
+
+
+def send_mouse_event(widget, event_type, position, button):
+
+    buttons = QtCore.Qt.MouseButton.NoButton if event_type == QtCore.QEvent.Type.MouseButtonRelease else button
+    event = QtGui.QMouseEvent(
+        event_type, QtCore.QPointF(position), QtCore.QPointF(widget.mapToGlobal(position)), button, buttons,
+        QtCore.Qt.KeyboardModifier.NoModifier)
+    QtWidgets.QApplication.sendEvent(widget, event)
+
+
+def create_board_view(size=40):
+
+    board = core.Board(dimensions=(size, size))
+    board.randomize(seed=6)
+    board_view = ui.BoardView(board)
+    board_view.show_complete_dialog = False
+    board_view.resize(500, 400)
+    board_view.show()
+    return board, board_view
+
+
+def test_board_view_drag_snaps_to_a_line(qt_app):
+
+    _, board_view = create_board_view()
+    edits = []
+    board_view.cells_edited.connect(edits.append)
+    viewport = board_view.viewport()
+    start = board_view.get_cell_rect(2, 3).center()
+    left_button = QtCore.Qt.MouseButton.LeftButton
+    send_mouse_event(viewport, QtCore.QEvent.Type.MouseButtonPress, start, left_button)
+    # Drifting a row down while dragging mostly sideways stays on the start row
+    send_mouse_event(viewport, QtCore.QEvent.Type.MouseMove, board_view.get_cell_rect(4, 9).center(), left_button)
+    send_mouse_event(viewport, QtCore.QEvent.Type.MouseMove, board_view.get_cell_rect(3, 7).center(), left_button)
+    send_mouse_event(
+        viewport, QtCore.QEvent.Type.MouseButtonRelease, board_view.get_cell_rect(3, 7).center(), left_button)
+
+    state = board_view.get_board_state()
+    filled = {
+        (row_index, column_index) for row_index in range(40) for column_index in range(40)
+        if state[row_index][column_index]}
+    expected = {(2, column_index) for column_index in range(3, 8)}
+    assert filled == expected
+    # Cells the longer drag passed over and left again are still reported so their lines are checked
+    assert edits == [expected | {(2, 8), (2, 9)}]
+
+
+def test_board_view_zoom_keeps_anchor(qt_app):
+
+    _, board_view = create_board_view()
+    # Start in the middle of the board so zooming out is not clamped at its edge
+    board_view.horizontalScrollBar().setValue(300)
+    board_view.verticalScrollBar().setValue(300)
+    anchor = QtCore.QPoint(130, 90)
+    cell = board_view.get_cell_at_position(anchor)
+    for steps in (3, -2, 1):
+        board_view.zoom(steps, anchor)
+        assert board_view.get_cell_at_position(anchor) == cell
+    board_view.set_cell_size(1000)
+    assert board_view.cell_size == board_view.MAX_CELL_SIZE
+    board_view.set_cell_size(0)
+    assert board_view.cell_size == board_view.MIN_CELL_SIZE
+
+
+def test_board_view_paints_and_completes(qt_app):
+
+    board, board_view = create_board_view()
+    for cell_size in (board_view.MIN_CELL_SIZE, board_view.DETAIL_CELL_SIZE, board_view.TEXT_CELL_SIZE, 30):
+        board_view.set_cell_size(cell_size)
+        assert not board_view.viewport().grab().isNull()
+    assert not board_view.check_completion()
+    board_view.set_board_state(board)
+    assert board_view.check_completion() and board_view.get_board_state() == board
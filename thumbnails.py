@@ -0,0 +1,155 @@
+"""Purpose: Render puzzle thumbnails off the GUI thread and cache them on disk."""
+
+import collections
+import hashlib
+import json
+import os
+import threading
+
+from PySide6 import QtCore, QtGui
+
+import core
+
+THUMBNAIL_SIZE = 96
+BLUR_SIZE = 8
+BLUR_CELLS = 4
+
+
+def get_cache_key(path):
+
+    with open(path, 'rb') as load_file:
+        content = load_file.read()
+    content_hash = hashlib.sha1(content)
+    content_hash.update(str(os.stat(path).st_mtime_ns).encode())
+    return content_hash.hexdigest(), content
+
+
+def get_blur_size(dimensions):
+
+    # About one blurred pixel per few cells, so small boards are not simply scaled up into their solution
+    return max(1, min(BLUR_SIZE, max(dimensions) // BLUR_CELLS))
+
+
+def render_board_image(board):
+
+    # One pixel per cell, built a row at a time from pre-packed palette colors
+    colors = [bytes(board.palette.empty_color)] + [bytes(color) for color in board.palette.colors]
+    width = board.dimensions[1]
+    data = b''.join(b''.join(colors[value] for value in row) for row in board)
+    image = QtGui.QImage(data, width, board.dimensions[0], width * 3, QtGui.QImage.Format.Format_RGB888)
+    return image.copy()
+
+
+def render_clue_image(clues, size):
+
+    # Clue-only puzzles show how much of each row and column is filled instead of the picture
+    image = QtGui.QImage(size, size, QtGui.QImage.Format.Format_RGB32)
+    image.fill(QtGui.QColor(*clues.palette.background_color))
+    painter = QtGui.QPainter(image)
+    fill_color = QtGui.QColor(*clues.palette.colors[0])
+    fill_color.setAlpha(160)
+    rows, columns = clues.dimensions
+    for index, key in enumerate(clues.rows):
+        filled = sum(island.length for island in key)
+        painter.fillRect(QtCore.QRectF(
+            0, index * size / rows, size * filled / columns, max(1.0, size / rows - 1)), fill_color)
+    for index, key in enumerate(clues.columns):
+        filled = sum(island.length for island in key)
+        painter.fillRect(QtCore.QRectF(
+            index * size / columns, size - size * filled / rows, max(1.0, size / columns - 1), size * filled / rows),
+            fill_color)
+    painter.end()
+    return image
+
+
+def render_thumbnail(puzzle_data, size=THUMBNAIL_SIZE, reveal=False):
+
+    board, clues = core.deserialize_puzzle(puzzle_data)
+    if board is None:
+        return render_clue_image(clues, size)
+
+    image = render_board_image(board)
+    mode = QtCore.Qt.TransformationMode
+    aspect = QtCore.Qt.AspectRatioMode.KeepAspectRatio
+    if reveal:
+        return image.scaled(size, size, aspect, mode.FastTransformation)
+    # Unsolved puzzles are blurred by shrinking before scaling back up with smoothing
+    blur_size = get_blur_size(board.dimensions)
+    return image.scaled(blur_size, blur_size, aspect, mode.SmoothTransformation).scaled(
+        size, size, aspect, mode.SmoothTransformation)
+
+
+class ThumbnailCache:
+
+    def __init__(self, cache_dir, max_entries=5000):
+
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Least recently used first, seeded from file modification times which are refreshed on every hit
+        entries = [
+            (entry.stat().st_mtime, entry.name[:-4]) for entry in os.scandir(self.cache_dir)
+            if entry.name.endswith('.png')]
+        self._entries = collections.OrderedDict((key, None) for _, key in sorted(entries))
+
+    def get_path(self, key):
+
+        return os.path.join(self.cache_dir, f'{key}.png')
+
+    def get(self, key):
+
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+        image = QtGui.QImage(self.get_path(key))
+        if image.isNull():
+            with self._lock:
+                self._entries.pop(key, None)
+            return None
+        os.utime(self.get_path(key))
+        return image
+
+    def put(self, key, image):
+
+        image.save(self.get_path(key), 'PNG')
+        with self._lock:
+            self._entries[key] = None
+            self._entries.move_to_end(key)
+            evicted = []
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False)[0])
+        for evicted_key in evicted:
+            try:
+                os.remove(self.get_path(evicted_key))
+            except FileNotFoundError:
+                pass
+
+
+class ThumbnailSignals(QtCore.QObject):
+    finished = QtCore.Signal(str, QtGui.QImage)
+
+
+class ThumbnailTask(QtCore.QRunnable):
+
+    def __init__(self, path, cache, size=THUMBNAIL_SIZE):
+        super(ThumbnailTask, self).__init__()
+
+        self.path = path
+        self.cache = cache
+        self.size = size
+        self.signals = ThumbnailSignals()
+
+    def run(self):
+
+        try:
+            key, content = get_cache_key(self.path)
+            image = self.cache.get(key)
+            if image is None:
+                image = render_thumbnail(json.loads(content), self.size)
+                self.cache.put(key, image)
+        except (OSError, ValueError, KeyError, IndexError, TypeError, AttributeError):
+            # Unreadable or malformed puzzles keep their placeholder icon
+            return
+        self.signals.finished.emit(self.path, image)
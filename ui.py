@@ -1,14 +1,22 @@
 """Picross board UI implemented with QT"""
 
+from concurrent import futures
+import multiprocessing
 import os
 import json
 from PySide6 import QtCore, QtWidgets, QtGui
 import core as core
+import progress
+import replay
+import solver
+import thumbnails
 
 
 class GameWindow(QtWidgets.QMainWindow):
     PUZZLE_DIR = os.path.join(os.getcwd(), 'puzzles')
     PALETTE_DIR = os.path.join(os.getcwd(), 'palettes')
+    THUMBNAIL_DIR = os.path.join(os.getcwd(), 'thumbnails')
+    LARGE_BOARD_SIZE = 30
 
     def __init__(self, parent=None):
         super(GameWindow, self).__init__(parent=parent)
@@ -20,11 +28,33 @@ class GameWindow(QtWidgets.QMainWindow):
         file_menu.addAction('New Game', self.new_game)
         file_menu.addAction('Complete Puzzle', self.complete_puzzle)
         file_menu.addAction('Save Puzzle', self.save_puzzle)
+        file_menu.addAction('Save Clue Puzzle', self.save_clue_puzzle)
         file_menu.addAction('Load Puzzle', self.load_puzzle)
+        file_menu.addAction('Browse Puzzles', self.browse_puzzles)
+        file_menu.addAction('Save Session', self.save_session)
+        file_menu.addAction('Load Session', self.load_session)
+        self.record_action = file_menu.addAction('Record Input')
+        self.record_action.setCheckable(True)
+        self.record_action.toggled.connect(self.toggle_recording)
         create_menu = QtWidgets.QMenu('Create')
         self.menuBar().addMenu(create_menu)
         create_menu.addAction('Create Puzzle', self.create_puzzle)
         create_menu.addAction('Create Palette', self.create_palette)
+        view_menu = QtWidgets.QMenu('View')
+        self.menuBar().addMenu(view_menu)
+        view_menu.addAction('Zoom In', QtGui.QKeySequence.StandardKey.ZoomIn, lambda: self.zoom_board(1))
+        view_menu.addAction('Zoom Out', QtGui.QKeySequence.StandardKey.ZoomOut, lambda: self.zoom_board(-1))
+        self.check_action = view_menu.addAction('Check My Work')
+        self.check_action.setCheckable(True)
+        self.check_action.toggled.connect(self.check_work)
+
+        # Session statistics are refreshed after every move and once a second for the clock
+        self.stats_label = QtWidgets.QLabel()
+        self.statusBar().addPermanentWidget(self.stats_label)
+        self.stats_timer = QtCore.QTimer(self)
+        self.stats_timer.setInterval(1000)
+        self.stats_timer.timeout.connect(self.update_stats_label)
+        self.stats_timer.start()
 
         self.board_widget = None
         self.init_board(self.generate_random_board((15, 10), 1))
@@ -51,13 +81,32 @@ class GameWindow(QtWidgets.QMainWindow):
 
         return board
 
-    def init_board(self, board):
+    def init_board(self, board, clues=None):
 
         if self.board_widget is not None:
+            if self.board_widget.analyzer is not None:
+                self.board_widget.analyzer.shutdown()
+            if self.board_widget.solution_finder is not None:
+                self.board_widget.solution_finder.shutdown()
             self.board_widget.close()
+        self.record_action.setChecked(False)
+        self.check_action.setChecked(False)
 
-        self.board_widget = BoardWidget(board=board, parent=self)
+        # Boards too large to lay out as Cell widgets are painted by a scrollable, zoomable BoardView
+        dimensions = board.dimensions if clues is None else clues.dimensions
+        board_class = BoardView if max(dimensions) > self.LARGE_BOARD_SIZE else BoardWidget
+        self.board_widget = board_class(board=board, clues=clues, parent=self)
         self.setCentralWidget(self.board_widget)
+        self.record_action.setEnabled(board_class is BoardWidget)
+        self.check_action.setEnabled(True)
+        self.board_widget.cells_edited.connect(self.update_stats_label)
+        self.board_widget.status_changed.connect(self.statusBar().showMessage)
+        self.update_stats_label()
+
+    def zoom_board(self, steps):
+
+        if isinstance(self.board_widget, BoardView):
+            self.board_widget.zoom(steps)
 
     def complete_puzzle(self):
 
@@ -71,11 +120,26 @@ class GameWindow(QtWidgets.QMainWindow):
             create_board = core.Board(dialog.dimensions, palette=dialog.palette)
             self.init_board(create_board)
             self.board_widget.complete = True
+            # Progress against a solution means nothing while the solution itself is being drawn
+            self.board_widget.stats = None
+            self.check_action.setEnabled(False)
+            self.update_stats_label()
+            tool_label = QtWidgets.QLabel('Tool:')
+            tool_combo = QtWidgets.QComboBox()
+            for tool_name, tool in BoardWidget.TOOLS.items():
+                tool_combo.addItem(tool_name, tool)
+            tool_combo.currentIndexChanged.connect(
+                lambda index: self.board_widget.set_tool(tool_combo.itemData(index)))
+            create_container(self.board_widget.layout(), (tool_label, tool_combo, None))
+            analysis_label = QtWidgets.QLabel()
+            self.board_widget.layout().addWidget(analysis_label)
+            self.board_widget.analyzer = EditAnalyzer(self.board_widget)
+            self.board_widget.analyzer.status_changed.connect(analysis_label.setText)
             save_button = QtWidgets.QPushButton('Save Puzzle')
             self.board_widget.layout().addWidget(save_button)
             save_button.clicked.connect(self.save_puzzle)
 
-    def save_puzzle(self):
+    def save_puzzle(self, clues_only=False):
 
         dialog = QtWidgets.QFileDialog(self, 'Save Puzzle', self.PUZZLE_DIR, f'JSON file (*.{core.FILE_EXTENSION})')
         dialog.setDefaultSuffix(f".{core.FILE_EXTENSION}")
@@ -83,8 +147,13 @@ class GameWindow(QtWidgets.QMainWindow):
         if dialog.exec():
             file_paths = dialog.selectedFiles()
             if file_paths:
+                board = self.board_widget.get_board_state()
                 with open(file_paths[0], 'w') as save_file:
-                    json.dump(self.board_widget.get_board_state().serialize(), save_file, indent=4)
+                    json.dump(board.serialize_clues() if clues_only else board.serialize(), save_file, indent=4)
+
+    def save_clue_puzzle(self):
+
+        self.save_puzzle(clues_only=True)
 
     def load_puzzle(self):
 
@@ -93,10 +162,87 @@ class GameWindow(QtWidgets.QMainWindow):
         if dialog.exec():
             file_paths = dialog.selectedFiles()
             if file_paths:
-                with open(file_paths[0], 'r') as load_file:
-                    puzzle_data = json.load(load_file)
-                loaded_board = core.Board.deserialize(puzzle_data)
-                self.init_board(loaded_board)
+                self.load_puzzle_file(file_paths[0])
+
+    def browse_puzzles(self):
+
+        dialog = PuzzleBrowser(self.PUZZLE_DIR, thumbnails.ThumbnailCache(self.THUMBNAIL_DIR), parent=self)
+        selected_path = dialog.selected_path if dialog.exec() else None
+        # The browser holds an icon per puzzle, free it instead of keeping it alive under the window
+        dialog.deleteLater()
+        if selected_path:
+            self.load_puzzle_file(selected_path)
+
+    def load_puzzle_file(self, path):
+
+        with open(path, 'r') as load_file:
+            puzzle_data = json.load(load_file)
+        loaded_board, loaded_clues = core.deserialize_puzzle(puzzle_data)
+        self.init_board(loaded_board, loaded_clues)
+
+    def save_session(self):
+
+        dialog = QtWidgets.QFileDialog(
+            self, 'Save Session', self.PUZZLE_DIR, f'Puzzle session (*.{progress.FILE_EXTENSION})')
+        dialog.setDefaultSuffix(f'.{progress.FILE_EXTENSION}')
+        dialog.setAcceptMode(QtWidgets.QFileDialog.AcceptMode.AcceptSave)
+        if self.board_widget.stats is not None and dialog.exec():
+            file_paths = dialog.selectedFiles()
+            if file_paths:
+                session = {
+                    'puzzle': replay.get_puzzle_data(self.board_widget),
+                    **replay.get_state_data(self.board_widget),
+                    'stats': self.board_widget.stats.serialize()}
+                with open(file_paths[0], 'w') as save_file:
+                    json.dump(session, save_file, indent=4)
+
+    def load_session(self):
+
+        dialog = QtWidgets.QFileDialog(
+            self, 'Load Session', self.PUZZLE_DIR, f'Puzzle session (*.{progress.FILE_EXTENSION})')
+        dialog.setAcceptMode(QtWidgets.QFileDialog.AcceptMode.AcceptOpen)
+        if dialog.exec():
+            file_paths = dialog.selectedFiles()
+            if file_paths:
+                self.load_session_file(file_paths[0])
+
+    def load_session_file(self, path):
+
+        with open(path, 'r') as load_file:
+            session = json.load(load_file)
+        loaded_board, loaded_clues = core.deserialize_puzzle(session['puzzle'])
+        self.init_board(loaded_board, loaded_clues)
+        self.board_widget.set_board_state(
+            core.Board.deserialize(session['state']), core.BoardCrossState.deserialize(session['cross']))
+        self.board_widget.stats.restore(session['stats'])
+        self.board_widget.complete = self.board_widget.check_completion()
+        self.update_stats_label()
+
+    def check_work(self, checked):
+
+        if self.board_widget is not None:
+            self.board_widget.check_work(checked)
+
+    def update_stats_label(self):
+
+        stats = None if self.board_widget is None else self.board_widget.stats
+        self.stats_label.setText('' if stats is None else stats.format_summary())
+
+    def toggle_recording(self, checked):
+
+        if checked:
+            self.board_widget.recorder = replay.InputRecorder(self.board_widget)
+        elif self.board_widget.recorder is not None:
+            recorder = self.board_widget.recorder
+            self.board_widget.recorder = None
+            dialog = QtWidgets.QFileDialog(
+                self, 'Save Recording', self.PUZZLE_DIR, f'Input recording (*.{replay.FILE_EXTENSION})')
+            dialog.setDefaultSuffix(f'.{replay.FILE_EXTENSION}')
+            dialog.setAcceptMode(QtWidgets.QFileDialog.AcceptMode.AcceptSave)
+            if dialog.exec():
+                file_paths = dialog.selectedFiles()
+                if file_paths:
+                    recorder.save(file_paths[0])
 
     def create_palette(self):
 
@@ -108,68 +254,88 @@ class GameWindow(QtWidgets.QMainWindow):
 
 
 class BoardWidget(QtWidgets.QWidget):
-
-    def __init__(self, board, parent=None):
+    TOOLS = {
+        'Straight Line': None,
+        'Line': 'line',
+        'Rectangle': 'rectangle',
+        'Filled Rectangle': 'filled_rectangle',
+        'Flood Fill': 'flood_fill',
+        'Copy Region': 'copy',
+        'Paste Region': 'paste',
+    }
+    cells_edited = QtCore.Signal(object)
+    status_changed = QtCore.Signal(str)
+
+    def __init__(self, board, clues=None, parent=None):
         super(BoardWidget, self).__init__(parent=parent)
 
+        # Board holds the solution grid and is None for clue-only puzzles until it is reconstructed
         self.board = board
+        self.clue_only = board is None
+        self.clues = core.BoardClues.from_board(board) if clues is None else clues
         self.complete = False
         # Drag operation variables
         self.drag_start = None
         self.drag_start_cell = None
         self.drag_cells = []
         self.drag_initial_state = None
+        # Input recording, cell events propagate up to this widget so recording here captures both
+        self.recorder = None
+        self.show_complete_dialog = True
+        # Editor tool variables, tools draw into a copy of the board data and push only the changed cells
+        self.tool = None
+        self.tool_start = None
+        self.tool_value = None
+        self.tool_initial_state = None
+        self.tool_changes = []
+        self.tool_touched = set()
+        self.clipboard = None
+        self.analyzer = None
+        self.highlighted_cells = set()
+        # Statistics follow every cell change, check my work highlights their mistake set directly
+        self.stats = progress.SessionStats(self.clues, solution=board)
+        self.show_mistakes = False
+        self.solution_finder = None
+        self.solution_unknown = False
+        self.complete_requested = False
+        self.cells_edited.connect(self.record_move)
 
         # Layout Setup
         self.setSizePolicy(QtWidgets.QSizePolicy.Policy.Minimum, QtWidgets.QSizePolicy.Policy.Minimum)
         self.setLayout(QtWidgets.QVBoxLayout())
         self.layout().setContentsMargins(0, 0, 0, 0)
-        grid_container = QtWidgets.QWidget()
-        self.layout().addWidget(grid_container)
+        self.grid_container = QtWidgets.QWidget()
+        self.layout().addWidget(self.grid_container)
         grid_layout = QtWidgets.QGridLayout()
-        grid_container.setLayout(grid_layout)
+        self.grid_container.setLayout(grid_layout)
         grid_layout.setSpacing(0)
         grid_layout.setVerticalSpacing(0)
         board_palette = QtGui.QPalette()
-        board_palette.setColor(QtGui.QPalette.ColorRole.Window, QtGui.QColor(*self.board.palette.background_color))
+        board_palette.setColor(QtGui.QPalette.ColorRole.Window, QtGui.QColor(*self.clues.palette.background_color))
         self.setAutoFillBackground(True)
         self.setPalette(board_palette)
 
         # Populate palette switching buttons
-        self.palette_buttons = []
-        if len(self.board.palette.colors) > 1:
-            button_container = QtWidgets.QWidget()
-            button_container.setLayout(QtWidgets.QVBoxLayout())
-            button_container.layout().setSpacing(0)
-            button_container.layout().addStretch()
+        button_container, self.palette_buttons = create_palette_buttons(self.clues.palette, self.index_selected)
+        if button_container is not None:
             grid_layout.addWidget(button_container, 0, 0)
-            for index, color in enumerate(self.board.palette.colors):
-                self.palette_buttons.append(QtWidgets.QToolButton())
-                self.palette_buttons[-1].setCheckable(True)
-                pixmap = get_icon_pixmap('circle', QtGui.QColor(*color))
-                icon = QtGui.QIcon(pixmap)
-                self.palette_buttons[-1].setIcon(icon)
-                button_container.layout().addWidget(self.palette_buttons[-1])
-                self.palette_buttons[-1].clicked.connect(self.index_selected)
-
-            self.palette_buttons[0].setChecked(True)
 
         self._index = 1
-        key_palettes = get_qt_palettes(self.board.palette)
-        key_palettes[0].setColor(QtGui.QPalette.ColorRole.Window, QtGui.QColor(*self.board.palette.empty_color))
+        key_palettes = get_qt_palettes(self.clues.palette)
+        key_palettes[0].setColor(QtGui.QPalette.ColorRole.Window, QtGui.QColor(*self.clues.palette.empty_color))
 
         # Populate board keys
         self.dividers = []
         for axis in (core.BoardAxis.ROW, core.BoardAxis.COLUMN):
             current_index = 1
             is_row = axis is core.BoardAxis.ROW
-            additional_length = int(self.board.dimensions[int(is_row)] / 5) - 1
-            length = self.board.dimensions[int(is_row)] + additional_length
-            axis_dimension = self.board.dimensions[axis.value]
+            additional_length = int(self.clues.dimensions[int(is_row)] / 5) - 1
+            length = self.clues.dimensions[int(is_row)] + additional_length
+            axis_dimension = self.clues.dimensions[axis.value]
             for axis_index in range(axis_dimension):
                 # Add divider every five cells
                 if axis_index % 5 == 0 and axis_index != 0:
-                    self.dividers.append(get_divider(self.board.palette, horizontal=is_row))
+                    self.dividers.append(get_divider(self.clues.palette, horizontal=is_row))
                     if is_row:
                         grid_layout.addWidget(self.dividers[-1], current_index, 1, 1, length)
                     else:
@@ -191,7 +357,7 @@ class BoardWidget(QtWidgets.QWidget):
                 if axis_index % 2 == 1:
                     container.setPalette(key_palettes[0])
                 # Add key blocks to containers
-                key = self.board.get_axis_key(axis_index, axis)
+                key = self.clues.get_axis_key(axis_index, axis)
                 layout.addStretch()
                 layout.setContentsMargins(0, 0, 0, 0)
                 buffer_width = axis is core.BoardAxis.ROW
@@ -207,14 +373,15 @@ class BoardWidget(QtWidgets.QWidget):
         # Populate board cells
         grid_index = [1, 1]
         self.cells = []
-        for row_index, row in enumerate(self.board):
+        for row_index in range(self.clues.dimensions[0]):
             if row_index % 5 == 0 and row_index != 0:
                 grid_index[0] += 1
             self.cells.append([])
-            for column_index in range(len(row)):
+            for column_index in range(self.clues.dimensions[1]):
                 if column_index % 5 == 0 and column_index != 0:
                     grid_index[1] += 1
-                new_cell = Cell(self.board.palette, self.get_index, (row_index, column_index), parent=self)
+                new_cell = Cell(
+                    self.clues.palette, self.get_index, (row_index, column_index), self.cell_changed, parent=self)
                 self.cells[row_index].append(new_cell)
                 grid_layout.addWidget(self.cells[row_index][-1], *grid_index)
                 grid_index[1] += 1
@@ -231,9 +398,9 @@ class BoardWidget(QtWidgets.QWidget):
     def cross_empty_sequences(self):
 
         for axis in (core.BoardAxis.ROW, core.BoardAxis.COLUMN):
-            axis_dimension = self.board.dimensions[axis.value]
+            axis_dimension = self.clues.dimensions[axis.value]
             for axis_index in range(axis_dimension):
-                key = self.board.get_axis_key(axis_index, axis)
+                key = self.clues.get_axis_key(axis_index, axis)
                 if key[0].length == 0:
                     if axis is core.BoardAxis.ROW:
                         sequence = self.cells[axis_index]
@@ -244,7 +411,7 @@ class BoardWidget(QtWidgets.QWidget):
 
     def get_board_state(self):
 
-        board = core.Board(self.board.dimensions, self.board.palette)
+        board = core.Board(self.clues.dimensions, self.clues.palette)
         for row_index, row in enumerate(board):
             for column_index, _ in enumerate(row):
                 row[column_index] = self.cells[row_index][column_index].index
@@ -252,30 +419,149 @@ class BoardWidget(QtWidgets.QWidget):
 
     def get_cross_state(self):
 
-        cross_board = core.BoardCrossState(self.board.dimensions)
+        cross_board = core.BoardCrossState(self.clues.dimensions)
         for row_index, row in enumerate(cross_board):
             for column_index, _ in enumerate(row):
                 row[column_index] = self.cells[row_index][column_index].cross
         return cross_board
 
+    def apply_cell_states(self, changes, complete=None):
+
+        # Cells only schedule a repaint when their state changes, Qt merges those into one paint pass
+        for row_index, column_index, index, crossed in changes:
+            cell = self.cells[row_index][column_index]
+            cell.set_state(index, crossed)
+            if complete is not None:
+                cell.set_complete_state(complete)
+
     def set_board_state(self, board, cross_state=None):
 
         if cross_state is None:
             cross_state = core.BoardCrossState(board.dimensions)
-        for row_index, row in enumerate(board):
-            for column_index, row_value in enumerate(row):
-                self.cells[row_index][column_index].set_state(row_value, cross_state[row_index][column_index])
+        self.apply_cell_states(
+            (row_index, column_index, row_value, cross_state[row_index][column_index])
+            for row_index, row in enumerate(board)
+            for column_index, row_value in enumerate(row))
 
     def index_selected(self):
 
-        for index, button in enumerate(self.palette_buttons):
-            if button.isChecked() and index + 1 != self._index:
-                self.palette_buttons[self._index - 1].setChecked(False)
-                self._index = index + 1
-                break
-            elif not button.isChecked() and index + 1 == self._index:
-                self.palette_buttons[self._index - 1].setChecked(True)
-                break
+        self._index = select_palette_index(self.palette_buttons, self._index)
+
+    def set_tool(self, tool):
+
+        self.tool = tool
+        for row in self.cells:
+            for cell in row:
+                cell.click_enabled = tool is None
+
+    def preview_tool(self, end):
+
+        board, cross_state = self.tool_initial_state
+        board = board.copy()
+        if self.tool == 'line':
+            changed = board.draw_line(self.tool_start, end, self.tool_value)
+        elif self.tool in ('rectangle', 'filled_rectangle'):
+            changed = board.draw_rectangle(
+                self.tool_start, end, self.tool_value, filled=self.tool == 'filled_rectangle')
+        elif self.tool == 'flood_fill':
+            changed = board.flood_fill(self.tool_start, self.tool_value)
+        elif self.tool == 'paste' and self.clipboard is not None:
+            changed = board.paste_region(self.clipboard, end)
+        else:
+            changed = []
+
+        # Cells changed by the previous preview but not this one go back to their initial state
+        positions = set(changed).union(self.tool_changes)
+        self.apply_cell_states(
+            (row_index, column_index, board[row_index][column_index],
+             cross_state[row_index][column_index] and not board[row_index][column_index])
+            for row_index, column_index in positions)
+        self.tool_changes = changed
+        self.tool_touched.update(positions)
+
+    def tool_event(self, event):
+
+        if event.type() == QtGui.QMouseEvent.Type.MouseButtonPress:
+            cell = self.get_cell_at_position(event.position().toPoint())
+            if cell:
+                self.tool_start = cell.grid_index
+                self.tool_value = self._index if QtCore.Qt.MouseButton.LeftButton in event.buttons() else 0
+                self.tool_initial_state = self.get_board_state(), self.get_cross_state()
+                self.tool_changes = []
+                self.tool_touched = set()
+                self.preview_tool(cell.grid_index)
+        elif self.tool_initial_state is not None and event.type() == QtGui.QMouseEvent.Type.MouseMove:
+            cell = self.get_cell_at_position(event.position().toPoint())
+            if cell and self.tool != 'flood_fill':
+                self.preview_tool(cell.grid_index)
+        elif self.tool_initial_state is not None and event.type() == QtGui.QMouseEvent.Type.MouseButtonRelease:
+            cell = self.get_cell_at_position(event.position().toPoint())
+            if self.tool == 'copy' and cell:
+                self.clipboard = self.tool_initial_state[0].get_region(self.tool_start, cell.grid_index)
+            self.tool_initial_state = None
+            self.tool_changes = []
+            if self.tool_touched:
+                self.cells_edited.emit(self.tool_touched)
+
+    def cell_changed(self, position, index, crossed):
+
+        if self.stats is not None:
+            self.stats.cell_changed(position, index, crossed)
+
+    def record_move(self, positions):
+
+        if self.stats is not None:
+            self.stats.record_move(positions)
+            if self.show_mistakes:
+                self.highlight_cells(self.stats.get_mistakes())
+
+    def check_work(self, show):
+
+        if self.stats is None:
+            return
+        self.show_mistakes = show
+        if show and self.stats.solution is None:
+            # Mistakes show once the background search delivers the solution
+            self.find_solution()
+            return
+        self.highlight_cells(self.stats.get_mistakes() if show else ())
+
+    def find_solution(self):
+
+        # Clue-only puzzles are solved in the background, solution_found picks up the result
+        if self.solution_unknown:
+            self.status_changed.emit('The solution of this puzzle could not be determined from its keys.')
+        elif self.solution_finder is None:
+            self.status_changed.emit('Searching for the solution...')
+            self.solution_finder = SolutionFinder(self.clues, parent=self)
+            self.solution_finder.solution_ready.connect(self.solution_found)
+
+    def solution_found(self, solution):
+
+        if solution is None:
+            self.solution_unknown = True
+            self.complete_requested = False
+            self.status_changed.emit('The solution of this puzzle could not be determined from its keys.')
+            return
+        self.status_changed.emit('')
+        if self.board is None:
+            self.board = solution
+        if self.stats is not None:
+            self.stats.set_solution(solution)
+            if self.show_mistakes:
+                self.highlight_cells(self.stats.get_mistakes())
+        if self.complete_requested:
+            self.complete_requested = False
+            self.complete_board()
+
+    def highlight_cells(self, positions):
+
+        positions = set(positions)
+        for row_index, column_index in self.highlighted_cells - positions:
+            self.cells[row_index][column_index].set_highlight(False)
+        for row_index, column_index in positions - self.highlighted_cells:
+            self.cells[row_index][column_index].set_highlight(True)
+        self.highlighted_cells = positions
 
     def get_cell_span_to_start(self, position, axis, direction):
 
@@ -299,10 +585,14 @@ class BoardWidget(QtWidgets.QWidget):
 
     def check_completion(self):
 
-        return True if self.board == self.get_board_state() else False
+        return self.clues.matches(self.get_board_state())
 
     def complete_board(self):
 
+        if self.board is None:
+            self.complete_requested = True
+            self.find_solution()
+            return
         self.set_board_state(self.board)
         self.complete = True
 
@@ -326,7 +616,12 @@ class BoardWidget(QtWidgets.QWidget):
 
     def event(self, event):
 
-        if event.type() == QtGui.QMouseEvent.Type.MouseButtonPress:
+        if self.recorder is not None and event.type() in replay.EVENT_TYPES:
+            self.recorder.record(event)
+
+        if self.tool is not None:
+            self.tool_event(event)
+        elif event.type() == QtGui.QMouseEvent.Type.MouseButtonPress:
             position = event.position().toPoint()
             self.drag_start_cell = self.get_cell_at_position(position)
             if self.drag_start_cell:
@@ -362,6 +657,8 @@ class BoardWidget(QtWidgets.QWidget):
                 self.set_board_state(*self.drag_initial_state)
                 self.drag_cells = []
         elif event.type() == QtGui.QMouseEvent.Type.MouseButtonRelease:
+            if self.drag_start_cell is not None:
+                self.cells_edited.emit({cell.grid_index for cell in [self.drag_start_cell] + self.drag_cells})
             self.drag_start_cell = None
             if not self.complete:
                 if self.check_completion():
@@ -372,24 +669,30 @@ class BoardWidget(QtWidgets.QWidget):
     def complete_event(self):
 
         self.complete = True
-        for row in self.cells:
-            for cell in row:
-                cell.set_complete_state(True)
+        if self.stats is not None:
+            self.stats.finish()
+        # Completed cells drop their crosses and frames
+        self.apply_cell_states(
+            ((*cell.grid_index, cell.index, False) for row in self.cells for cell in row), complete=True)
         for divider in self.dividers:
             divider.hide()
-        CompleteDialog(self).exec()
+        if self.show_complete_dialog:
+            CompleteDialog(self).exec()
 
 
 class Cell(QtWidgets.QFrame):
     SIZE = 18
 
-    def __init__(self, palette, index_call, grid_index, parent=None):
+    def __init__(self, palette, index_call, grid_index, change_call=None, parent=None):
         super(Cell, self).__init__(parent=parent)
 
         self._index = 0
         self._cross = False
         self._complete = False
+        self.click_enabled = True
+        self._highlight = False
         self.index_call = index_call
+        self.change_call = change_call
         self.grid_index = grid_index
         self.color_palette = palette
         self.setFixedSize(self.SIZE, self.SIZE)
@@ -403,7 +706,7 @@ class Cell(QtWidgets.QFrame):
 
     def event(self, event):
 
-        if event.type() == QtGui.QMouseEvent.Type.MouseButtonPress and not self._complete:
+        if event.type() == QtGui.QMouseEvent.Type.MouseButtonPress and not self._complete and self.click_enabled:
             if QtCore.Qt.MouseButton.LeftButton in event.buttons():
                 self.index = self.index_call()
             elif QtCore.Qt.MouseButton.RightButton in event.buttons():
@@ -413,24 +716,44 @@ class Cell(QtWidgets.QFrame):
 
     def paintEvent(self, event) -> None:
 
-        if self._cross:
+        if self._cross or self._highlight:
             painter = QtGui.QPainter(self)
-            painter.drawPixmap(QtCore.QRect(2, 2, self.SIZE - 4, self.SIZE - 4), self.cross_pixmap)
+            if self._cross:
+                painter.drawPixmap(QtCore.QRect(2, 2, self.SIZE - 4, self.SIZE - 4), self.cross_pixmap)
+            if self._highlight:
+                pen = QtGui.QPen(QtGui.QColor(*self.color_palette.marking_color), 2, QtCore.Qt.PenStyle.DotLine)
+                painter.setPen(pen)
+                painter.drawRect(QtCore.QRect(2, 2, self.SIZE - 5, self.SIZE - 5))
+            painter.end()
         return super(Cell, self).paintEvent(event)
 
+    def set_highlight(self, highlight):
+
+        if highlight != self._highlight:
+            self._highlight = highlight
+            self.update()
+
     def set_state(self, index, crossed):
 
-        self._index = index
-        self.setPalette(self.fill_palettes[self._index])
+        # Only touch the palette and schedule a repaint when the state actually changes
+        if index == self._index and crossed == self._cross:
+            return
+        if index != self._index:
+            self._index = index
+            self.setPalette(self.fill_palettes[self._index])
         self._cross = crossed
         self.update()
+        if self.change_call is not None:
+            self.change_call(self.grid_index, index, crossed)
 
     def set_complete_state(self, complete):
 
         self._complete = complete
         if self._complete:
             self.cross = False
-        self.setFrameShape(QtWidgets.QFrame.Shape.NoFrame if self._complete else QtWidgets.QFrame.Shape.Box)
+        frame_shape = QtWidgets.QFrame.Shape.NoFrame if self._complete else QtWidgets.QFrame.Shape.Box
+        if self.frameShape() != frame_shape:
+            self.setFrameShape(frame_shape)
 
     @property
     def index(self):
@@ -441,10 +764,8 @@ class Cell(QtWidgets.QFrame):
     def index(self, value):
 
         if not self._complete:
-            self._index = 0 if self._index == value else value
-            self.setPalette(self.fill_palettes[self._index])
-            if self._index:
-                self.cross = False
+            index = 0 if self._index == value else value
+            self.set_state(index, self._cross and not index)
 
     @property
     def cross(self):
@@ -454,10 +775,613 @@ class Cell(QtWidgets.QFrame):
     @cross.setter
     def cross(self, value):
 
-        self._cross = value
-        self.update()
-        if value:
-            self.index = 0
+        self.set_state(0 if value and not self._complete else self._index, value)
+
+
+class BoardView(QtWidgets.QAbstractScrollArea):
+    MIN_CELL_SIZE = 2
+    MAX_CELL_SIZE = 48
+    DETAIL_CELL_SIZE = 6
+    TEXT_CELL_SIZE = 10
+    ZOOM_STEP = 1.25
+    cells_edited = QtCore.Signal(object)
+    status_changed = QtCore.Signal(str)
+
+    def __init__(self, board, clues=None, parent=None):
+        super(BoardView, self).__init__(parent=parent)
+
+        # Large boards are painted rather than built from Cell widgets, only the visible area is ever drawn
+        self.board = board
+        self.clue_only = board is None
+        self.clues = core.BoardClues.from_board(board) if clues is None else clues
+        self.complete = False
+        self.recorder = None
+        self.analyzer = None
+        self.show_complete_dialog = True
+        self.cell_size = Cell.SIZE
+        self.state = core.Board(self.clues.dimensions, self.clues.palette)
+        self.cross_state = core.BoardCrossState(self.clues.dimensions)
+        # Drag operation variables, only the cells a drag touches keep their initial state
+        self.drag_start = None
+        self.drag_value = None
+        self.drag_cells = []
+        self.drag_initial_state = {}
+        self.stats = progress.SessionStats(self.clues, solution=board)
+        self.show_mistakes = False
+        self.solution_finder = None
+        self.solution_unknown = False
+        self.complete_requested = False
+        self.highlighted_cells = set()
+        self.cells_edited.connect(self.record_move)
+
+        palette = self.clues.palette
+        self.colors = [QtGui.QColor(*palette.empty_color)] + [QtGui.QColor(*color) for color in palette.colors]
+        self.background_color = QtGui.QColor(*palette.background_color)
+        self.marking_color = QtGui.QColor(*palette.marking_color)
+        # One pixel per cell, scaled up when painted
+        rows, columns = self.clues.dimensions
+        self.image = QtGui.QImage(columns, rows, QtGui.QImage.Format.Format_RGB32)
+        self.image.fill(self.colors[0])
+        self.max_islands = {
+            axis: max(len([island for island in key if island.length]) for key in keys)
+            for axis, keys in ((core.BoardAxis.ROW, self.clues.rows), (core.BoardAxis.COLUMN, self.clues.columns))}
+        self.unsolved_lines = set()
+        self.update_lines(
+            [(core.BoardAxis.ROW, index) for index in range(rows)]
+            + [(core.BoardAxis.COLUMN, index) for index in range(columns)])
+
+        self.row_header = ClueHeader(self, core.BoardAxis.ROW)
+        self.column_header = ClueHeader(self, core.BoardAxis.COLUMN)
+        self._index = 1
+        self.button_container, self.palette_buttons = create_palette_buttons(palette, self.index_selected)
+        if self.button_container is not None:
+            self.button_container.setParent(self)
+
+        self.horizontalScrollBar().valueChanged.connect(self.column_header.update)
+        self.verticalScrollBar().valueChanged.connect(self.row_header.update)
+        self.update_layout()
+        self.cross_empty_sequences()
+
+    def index_selected(self):
+
+        self._index = select_palette_index(self.palette_buttons, self._index)
+
+    def get_index(self):
+
+        return self._index
+
+    def update_layout(self):
+
+        cell_size = self.cell_size
+        row_extent = self.max_islands[core.BoardAxis.ROW] * self.get_header_block_size(core.BoardAxis.ROW)
+        column_extent = self.max_islands[core.BoardAxis.COLUMN] * self.get_header_block_size(core.BoardAxis.COLUMN)
+        corner_size = QtCore.QSize(0, 0) if self.button_container is None else self.button_container.sizeHint()
+        row_header_width = max(row_extent, corner_size.width()) + 2
+        column_header_height = max(column_extent, corner_size.height()) + 2
+        self.setViewportMargins(row_header_width, column_header_height, 0, 0)
+
+        contents = self.contentsRect()
+        viewport = self.viewport().geometry()
+        self.row_header.setGeometry(contents.left(), viewport.top(), row_header_width, viewport.height())
+        self.column_header.setGeometry(viewport.left(), contents.top(), viewport.width(), column_header_height)
+        if self.button_container is not None:
+            self.button_container.setGeometry(contents.left(), contents.top(), row_header_width, column_header_height)
+
+        rows, columns = self.clues.dimensions
+        for scroll_bar, length, page in (
+                (self.horizontalScrollBar(), columns * cell_size, viewport.width()),
+                (self.verticalScrollBar(), rows * cell_size, viewport.height())):
+            scroll_bar.setRange(0, max(0, length - page))
+            scroll_bar.setPageStep(page)
+            scroll_bar.setSingleStep(cell_size)
+
+    def get_header_block_size(self, axis):
+
+        # Headers take at most a third of the view, keys with many islands shrink their blocks to fit
+        extent = (self.width() if axis is core.BoardAxis.ROW else self.height()) // 3
+        return max(1, min(self.cell_size, extent // max(1, self.max_islands[axis])))
+
+    def get_visible_range(self, axis):
+
+        # Returns the first and one past the last line index inside the viewport along an axis
+        if axis is core.BoardAxis.ROW:
+            offset, length = self.verticalScrollBar().value(), self.viewport().height()
+        else:
+            offset, length = self.horizontalScrollBar().value(), self.viewport().width()
+        first = offset // self.cell_size
+        last = min(self.clues.dimensions[axis.value], (offset + length) // self.cell_size + 1)
+        return first, last
+
+    def get_cell_rect(self, row_index, column_index):
+
+        return QtCore.QRect(
+            column_index * self.cell_size - self.horizontalScrollBar().value(),
+            row_index * self.cell_size - self.verticalScrollBar().value(),
+            self.cell_size,
+            self.cell_size)
+
+    def get_cell_at_position(self, position):
+
+        row_index = (position.y() + self.verticalScrollBar().value()) // self.cell_size
+        column_index = (position.x() + self.horizontalScrollBar().value()) // self.cell_size
+        if 0 <= row_index < self.clues.dimensions[0] and 0 <= column_index < self.clues.dimensions[1]:
+            return row_index, column_index
+        return None
+
+    def set_cell_size(self, cell_size, anchor=None):
+
+        cell_size = max(self.MIN_CELL_SIZE, min(self.MAX_CELL_SIZE, cell_size))
+        if cell_size == self.cell_size:
+            return
+        # Keep the board position under the anchor point fixed while zooming
+        anchor = self.viewport().rect().center() if anchor is None else anchor
+        board_x = (self.horizontalScrollBar().value() + anchor.x()) / self.cell_size
+        board_y = (self.verticalScrollBar().value() + anchor.y()) / self.cell_size
+        self.cell_size = cell_size
+        self.update_layout()
+        self.horizontalScrollBar().setValue(int(board_x * cell_size - anchor.x()))
+        self.verticalScrollBar().setValue(int(board_y * cell_size - anchor.y()))
+        self.viewport().update()
+        self.row_header.update()
+        self.column_header.update()
+
+    def zoom(self, steps, anchor=None):
+
+        cell_size = round(self.cell_size * self.ZOOM_STEP ** steps)
+        if cell_size == self.cell_size:
+            cell_size += 1 if steps > 0 else -1
+        self.set_cell_size(cell_size, anchor)
+
+    def set_cell(self, row_index, column_index, index, crossed):
+
+        if self.state[row_index][column_index] == index and self.cross_state[row_index][column_index] == crossed:
+            return False
+        if self.state[row_index][column_index] != index:
+            self.state[row_index][column_index] = index
+            self.image.setPixelColor(column_index, row_index, self.colors[index])
+        self.cross_state[row_index][column_index] = crossed
+        # Cell rects are merged into one viewport repaint by Qt
+        self.viewport().update(self.get_cell_rect(row_index, column_index))
+        if self.stats is not None:
+            self.stats.cell_changed((row_index, column_index), index, crossed)
+        return True
+
+    def update_lines(self, lines):
+
+        for axis, index in lines:
+            if self.state.get_axis_key(index, axis) == self.clues.get_axis_key(index, axis):
+                self.unsolved_lines.discard((axis, index))
+            else:
+                self.unsolved_lines.add((axis, index))
+
+    def get_lines(self, positions):
+
+        return (
+            {(core.BoardAxis.ROW, row_index) for row_index, _ in positions}
+            | {(core.BoardAxis.COLUMN, column_index) for _, column_index in positions})
+
+    def cross_empty_sequences(self):
+
+        for axis in (core.BoardAxis.ROW, core.BoardAxis.COLUMN):
+            for axis_index in range(self.clues.dimensions[axis.value]):
+                if self.clues.get_axis_key(axis_index, axis)[0].length == 0:
+                    for other_index in range(self.clues.dimensions[1 - axis.value]):
+                        if axis is core.BoardAxis.ROW:
+                            self.set_cell(axis_index, other_index, 0, True)
+                        else:
+                            self.set_cell(other_index, axis_index, 0, True)
+
+    def get_board_state(self):
+
+        return self.state.copy()
+
+    def get_cross_state(self):
+
+        cross_board = core.BoardCrossState(self.clues.dimensions)
+        for row_index, row in enumerate(self.cross_state):
+            cross_board[row_index] = list(row)
+        return cross_board
+
+    def set_board_state(self, board, cross_state=None):
+
+        if cross_state is None:
+            cross_state = core.BoardCrossState(board.dimensions)
+        changed = [
+            (row_index, column_index)
+            for row_index, row in enumerate(board)
+            for column_index, row_value in enumerate(row)
+            if self.set_cell(row_index, column_index, row_value, cross_state[row_index][column_index])]
+        self.update_lines(self.get_lines(changed))
+
+    def check_completion(self):
+
+        return not self.unsolved_lines
+
+    def record_move(self, positions):
+
+        if self.stats is not None:
+            self.stats.record_move(positions)
+            if self.show_mistakes:
+                self.highlight_cells(self.stats.get_mistakes())
+
+    def check_work(self, show):
+
+        if self.stats is None:
+            return
+        self.show_mistakes = show
+        if show and self.stats.solution is None:
+            # Mistakes show once the background search delivers the solution
+            self.find_solution()
+            return
+        self.highlight_cells(self.stats.get_mistakes() if show else ())
+
+    def find_solution(self):
+
+        # Clue-only puzzles are solved in the background, solution_found picks up the result
+        if self.solution_unknown:
+            self.status_changed.emit('The solution of this puzzle could not be determined from its keys.')
+        elif self.solution_finder is None:
+            self.status_changed.emit('Searching for the solution...')
+            self.solution_finder = SolutionFinder(self.clues, parent=self)
+            self.solution_finder.solution_ready.connect(self.solution_found)
+
+    def solution_found(self, solution):
+
+        if solution is None:
+            self.solution_unknown = True
+            self.complete_requested = False
+            self.status_changed.emit('The solution of this puzzle could not be determined from its keys.')
+            return
+        self.status_changed.emit('')
+        if self.board is None:
+            self.board = solution
+        if self.stats is not None:
+            self.stats.set_solution(solution)
+            if self.show_mistakes:
+                self.highlight_cells(self.stats.get_mistakes())
+        if self.complete_requested:
+            self.complete_requested = False
+            self.complete_board()
+
+    def highlight_cells(self, positions):
+
+        positions = set(positions)
+        for position in positions.symmetric_difference(self.highlighted_cells):
+            self.viewport().update(self.get_cell_rect(*position))
+        self.highlighted_cells = positions
+
+    def complete_board(self):
+
+        if self.board is None:
+            self.complete_requested = True
+            self.find_solution()
+            return
+        self.set_board_state(self.board)
+        self.complete = True
+
+    def complete_event(self):
+
+        self.complete = True
+        if self.stats is not None:
+            self.stats.finish()
+        for row_index, row in enumerate(self.cross_state):
+            self.cross_state[row_index] = [False] * len(row)
+        self.viewport().update()
+        if self.show_complete_dialog:
+            CompleteDialog(self).exec()
+
+    def get_drag_span(self, end):
+
+        # Snap the drag to the row or column of the start cell like BoardWidget.snap_point_to_cardinal
+        start_row, start_column = self.drag_start
+        row_distance, column_distance = end[0] - start_row, end[1] - start_column
+        if abs(column_distance) > abs(row_distance):
+            step = 1 if column_distance > 0 else -1
+            return [(start_row, column_index) for column_index in range(start_column + step, end[1] + step, step)]
+        step = 1 if row_distance > 0 else -1
+        return [(row_index, start_column) for row_index in range(start_row + step, end[0] + step, step)]
+
+    def mousePressEvent(self, event):
+
+        cell = self.get_cell_at_position(event.position().toPoint())
+        if cell is None or self.complete:
+            return super(BoardView, self).mousePressEvent(event)
+
+        row_index, column_index = cell
+        index, crossed = self.state[row_index][column_index], self.cross_state[row_index][column_index]
+        if QtCore.Qt.MouseButton.LeftButton in event.buttons():
+            index = 0 if index == self._index else self._index
+            crossed = crossed and not index
+        elif QtCore.Qt.MouseButton.RightButton in event.buttons():
+            crossed = not crossed
+            index = 0 if crossed else index
+        else:
+            return super(BoardView, self).mousePressEvent(event)
+
+        self.drag_start = cell
+        self.drag_value = index, crossed
+        self.drag_cells = []
+        self.drag_initial_state = {}
+        self.set_cell(row_index, column_index, index, crossed)
+
+    def mouseMoveEvent(self, event):
+
+        if self.drag_start is None:
+            return super(BoardView, self).mouseMoveEvent(event)
+        end = self.get_cell_at_position(event.position().toPoint())
+        if end is None:
+            return
+        current_drag = [] if end == self.drag_start else self.get_drag_span(end)
+        if current_drag == self.drag_cells:
+            return
+        for position in set(self.drag_cells).difference(current_drag):
+            self.set_cell(*position, *self.drag_initial_state[position])
+        for row_index, column_index in current_drag:
+            if (row_index, column_index) not in self.drag_initial_state:
+                self.drag_initial_state[(row_index, column_index)] = (
+                    self.state[row_index][column_index], self.cross_state[row_index][column_index])
+            self.set_cell(row_index, column_index, *self.drag_value)
+        self.drag_cells = current_drag
+
+    def mouseReleaseEvent(self, event):
+
+        if self.drag_start is None:
+            return super(BoardView, self).mouseReleaseEvent(event)
+        positions = {self.drag_start, *self.drag_initial_state}
+        self.drag_start = None
+        self.update_lines(self.get_lines(positions))
+        self.cells_edited.emit(positions)
+        if not self.complete and self.check_completion():
+            self.complete_event()
+
+    def wheelEvent(self, event):
+
+        if event.modifiers() & QtCore.Qt.KeyboardModifier.ControlModifier:
+            self.zoom(event.angleDelta().y() / 120, event.position().toPoint())
+            event.accept()
+        else:
+            super(BoardView, self).wheelEvent(event)
+
+    def resizeEvent(self, event):
+
+        super(BoardView, self).resizeEvent(event)
+        self.update_layout()
+
+    def scrollContentsBy(self, dx, dy):
+
+        self.viewport().update()
+
+    def paintEvent(self, event):
+
+        painter = QtGui.QPainter(self.viewport())
+        painter.fillRect(event.rect(), self.background_color)
+        first_row, last_row = self.get_visible_range(core.BoardAxis.ROW)
+        first_column, last_column = self.get_visible_range(core.BoardAxis.COLUMN)
+        if first_row >= last_row or first_column >= last_column:
+            painter.end()
+            return
+        cell_size = self.cell_size
+        x_offset, y_offset = self.horizontalScrollBar().value(), self.verticalScrollBar().value()
+        left, top = first_column * cell_size - x_offset, first_row * cell_size - y_offset
+        right, bottom = last_column * cell_size - x_offset, last_row * cell_size - y_offset
+
+        source = QtCore.QRect(first_column, first_row, last_column - first_column, last_row - first_row)
+        painter.drawImage(QtCore.QRect(left, top, right - left, bottom - top), self.image, source)
+
+        if cell_size >= self.DETAIL_CELL_SIZE and not self.complete:
+            painter.setPen(self.background_color)
+            for column_index in range(first_column, last_column + 1):
+                x = column_index * cell_size - x_offset
+                painter.drawLine(x, top, x, bottom)
+            for row_index in range(first_row, last_row + 1):
+                y = row_index * cell_size - y_offset
+                painter.drawLine(left, y, right, y)
+
+            painter.setPen(QtGui.QPen(self.marking_color, 2))
+            for column_index in range(first_column - first_column % 5, last_column, 5):
+                if column_index:
+                    x = column_index * cell_size - x_offset
+                    painter.drawLine(x, top, x, bottom)
+            for row_index in range(first_row - first_row % 5, last_row, 5):
+                if row_index:
+                    y = row_index * cell_size - y_offset
+                    painter.drawLine(left, y, right, y)
+
+            inset = max(1, cell_size // 5)
+            for row_index in range(first_row, last_row):
+                cross_row = self.cross_state[row_index]
+                for column_index in range(first_column, last_column):
+                    if cross_row[column_index]:
+                        rect = self.get_cell_rect(row_index, column_index).adjusted(inset, inset, -inset, -inset)
+                        painter.drawLine(rect.topLeft(), rect.bottomRight())
+                        painter.drawLine(rect.topRight(), rect.bottomLeft())
+
+        # Highlights stay visible when zoomed out by filling the cell instead of outlining it
+        if self.highlighted_cells:
+            if cell_size >= self.DETAIL_CELL_SIZE:
+                painter.setPen(QtGui.QPen(self.marking_color, 2, QtCore.Qt.PenStyle.DotLine))
+                painter.setBrush(QtCore.Qt.BrushStyle.NoBrush)
+            for row_index, column_index in self.highlighted_cells:
+                if first_row <= row_index < last_row and first_column <= column_index < last_column:
+                    rect = self.get_cell_rect(row_index, column_index)
+                    if cell_size >= self.DETAIL_CELL_SIZE:
+                        painter.drawRect(rect.adjusted(1, 1, -2, -2))
+                    else:
+                        painter.fillRect(rect, self.marking_color)
+        painter.end()
+
+
+class ClueHeader(QtWidgets.QWidget):
+
+    def __init__(self, board_view, axis):
+        super(ClueHeader, self).__init__(parent=board_view)
+
+        self.board_view = board_view
+        self.axis = axis
+        # One pixel per island for drawing keys too small for text, islands are aligned against the board edge
+        is_row = axis is core.BoardAxis.ROW
+        keys = board_view.clues.rows if is_row else board_view.clues.columns
+        islands = board_view.max_islands[axis]
+        size = QtCore.QSize(islands, len(keys)) if is_row else QtCore.QSize(len(keys), islands)
+        self.image = QtGui.QImage(size, QtGui.QImage.Format.Format_ARGB32)
+        self.image.fill(QtCore.Qt.GlobalColor.transparent)
+        for line_index, key in enumerate(keys):
+            key = [island for island in key if island.length]
+            for island_offset, island in enumerate(reversed(key), 1):
+                if is_row:
+                    self.image.setPixelColor(islands - island_offset, line_index, board_view.colors[island.index])
+                else:
+                    self.image.setPixelColor(line_index, islands - island_offset, board_view.colors[island.index])
+
+    def paintEvent(self, event):
+
+        view = self.board_view
+        palette = view.clues.palette
+        cell_size = view.cell_size
+        block_size = view.get_header_block_size(self.axis)
+        painter = QtGui.QPainter(self)
+        painter.fillRect(event.rect(), view.background_color)
+        font = painter.font()
+        font.setPixelSize(max(6, int(min(cell_size, block_size) * 0.6)))
+        painter.setFont(font)
+        stripe_color = QtGui.QColor(*palette.empty_color)
+        is_row = self.axis is core.BoardAxis.ROW
+        offset = view.verticalScrollBar().value() if is_row else view.horizontalScrollBar().value()
+
+        first, last = view.get_visible_range(self.axis)
+        for line_index in range(first, last):
+            line_start = line_index * cell_size - offset
+            if is_row:
+                line_rect = QtCore.QRect(0, line_start, self.width(), cell_size)
+            else:
+                line_rect = QtCore.QRect(line_start, 0, cell_size, self.height())
+            if line_index % 2 == 1:
+                painter.fillRect(line_rect, stripe_color)
+            if (self.axis, line_index) not in view.unsolved_lines:
+                painter.fillRect(line_rect, QtGui.QColor(255, 255, 255, 90))
+
+        # Islands are right aligned against the board for rows and bottom aligned for columns
+        if min(cell_size, block_size) < view.TEXT_CELL_SIZE:
+            islands = view.max_islands[self.axis]
+            line_start = first * cell_size - offset
+            key_extent = islands * block_size
+            line_extent = (last - first) * cell_size
+            if is_row:
+                source = QtCore.QRect(0, first, islands, last - first)
+                target = QtCore.QRect(self.width() - 2 - key_extent, line_start, key_extent, line_extent)
+            else:
+                source = QtCore.QRect(first, 0, last - first, islands)
+                target = QtCore.QRect(line_start, self.height() - 2 - key_extent, line_extent, key_extent)
+            painter.drawImage(target, self.image, source)
+        else:
+            for line_index in range(first, last):
+                line_start = line_index * cell_size - offset
+                key = [island for island in view.clues.get_axis_key(line_index, self.axis) if island.length]
+                for island_offset, island in enumerate(reversed(key), 1):
+                    if is_row:
+                        block_start = self.width() - 2 - island_offset * block_size
+                        block = QtCore.QRect(block_start, line_start, block_size, cell_size)
+                    else:
+                        block_start = self.height() - 2 - island_offset * block_size
+                        block = QtCore.QRect(line_start, block_start, cell_size, block_size)
+                    color = view.colors[island.index]
+                    painter.fillRect(block.adjusted(0, 0, -1, -1), color)
+                    painter.setPen(QtGui.QColor('white') if color.lightness() < 140 else QtGui.QColor('black'))
+                    painter.drawText(block, QtCore.Qt.AlignmentFlag.AlignCenter, str(island.length))
+        painter.end()
+
+
+class EditAnalyzer(QtCore.QObject):
+    DEBOUNCE_MS = 300
+    analysis_ready = QtCore.Signal(object)
+    status_changed = QtCore.Signal(str)
+
+    def __init__(self, board_widget):
+        super(EditAnalyzer, self).__init__(parent=board_widget)
+
+        self.board_widget = board_widget
+        self.clues = core.BoardClues.from_board(board_widget.get_board_state())
+        # A single worker process keeps the solver line cache warm between edits and off the GUI thread
+        self.executor = futures.ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'))
+        self.pending = None
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(self.DEBOUNCE_MS)
+        self.timer.timeout.connect(self.submit)
+
+        self.analysis_ready.connect(self.analysis_finished)
+        self.board_widget.cells_edited.connect(self.cells_edited)
+        self.timer.start()
+
+    def cells_edited(self, positions):
+
+        # Only the keys of the touched rows and columns are derived again
+        cells = self.board_widget.cells
+        for row_index in {row_index for row_index, _ in positions}:
+            self.clues.rows[row_index] = core.get_sequence_key([cell.index for cell in cells[row_index]])
+        for column_index in {column_index for _, column_index in positions}:
+            self.clues.columns[column_index] = core.get_sequence_key([row[column_index].index for row in cells])
+        self.timer.start()
+
+    def submit(self):
+
+        if self.pending is not None and not self.pending.done():
+            self.timer.start()
+            return
+        clues = core.BoardClues(
+            self.clues.dimensions, self.clues.palette, list(self.clues.rows), list(self.clues.columns))
+        self.pending = self.executor.submit(solver.analyze, clues)
+        self.pending.add_done_callback(self.analysis_done)
+
+    def analysis_done(self, future):
+
+        # Runs on an executor thread, the signal queues the result or the worker error over to the GUI thread
+        if future.cancelled():
+            return
+        error = future.exception()
+        self.analysis_ready.emit(future.result() if error is None else error)
+
+    def analysis_finished(self, ambiguous_cells):
+
+        if self.timer.isActive():
+            return  # Newer edits are waiting to be analyzed
+        if isinstance(ambiguous_cells, Exception):
+            self.status_changed.emit(f'The puzzle keys could not be analyzed: {ambiguous_cells!r}')
+            ambiguous_cells = []
+        elif ambiguous_cells is None:
+            self.status_changed.emit('The puzzle keys contradict each other.')
+            ambiguous_cells = []
+        elif ambiguous_cells:
+            self.status_changed.emit(f'{len(ambiguous_cells)} cells cannot be deduced from the keys.')
+        else:
+            self.status_changed.emit('The puzzle has a unique solution.')
+        self.board_widget.highlight_cells(ambiguous_cells)
+
+    def shutdown(self):
+
+        # Analyses still running when the board goes away must not reach its widgets
+        self.timer.stop()
+        self.analysis_ready.disconnect(self.analysis_finished)
+        self.board_widget.cells_edited.disconnect(self.cells_edited)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class SolutionFinder(QtCore.QObject):
+    solution_ready = QtCore.Signal(object)
+
+    def __init__(self, clues, parent=None):
+        super(SolutionFinder, self).__init__(parent=parent)
+
+        # Reconstructing a clue-only solution can take a while and cannot be interrupted, so it runs in a worker
+        # process that shutdown terminates
+        self.pool = multiprocessing.get_context('spawn').Pool(1)
+        self.pool.apply_async(
+            solver.reconstruct, (clues,), callback=self.solution_ready.emit,
+            error_callback=lambda error: self.solution_ready.emit(None))
+
+    def shutdown(self):
+
+        self.pool.terminate()
 
 
 class CompleteDialog(QtWidgets.QDialog):
@@ -475,6 +1399,68 @@ class CompleteDialog(QtWidgets.QDialog):
         close_button.clicked.connect(self.close)
 
 
+class PuzzleBrowser(QtWidgets.QDialog):
+
+    def __init__(self, puzzle_dir, cache, parent=None):
+        super(PuzzleBrowser, self).__init__(parent=parent)
+
+        self.setWindowTitle('Browse Puzzles')
+        self.resize(640, 480)
+        self.selected_path = None
+        self.cache = cache
+        # Thumbnails render on a private pool so closing the browser drops any queued work
+        self.thread_pool = QtCore.QThreadPool(self)
+
+        self.setLayout(QtWidgets.QVBoxLayout())
+        self.list_widget = QtWidgets.QListWidget()
+        self.list_widget.setViewMode(QtWidgets.QListView.ViewMode.IconMode)
+        self.list_widget.setResizeMode(QtWidgets.QListView.ResizeMode.Adjust)
+        self.list_widget.setMovement(QtWidgets.QListView.Movement.Static)
+        self.list_widget.setUniformItemSizes(True)
+        self.list_widget.setIconSize(QtCore.QSize(thumbnails.THUMBNAIL_SIZE, thumbnails.THUMBNAIL_SIZE))
+        self.layout().addWidget(self.list_widget)
+        open_button = QtWidgets.QPushButton('Open')
+        cancel_button = QtWidgets.QPushButton('Cancel')
+        create_container(self.layout(), (None, open_button, cancel_button))
+
+        placeholder = QtGui.QPixmap(thumbnails.THUMBNAIL_SIZE, thumbnails.THUMBNAIL_SIZE)
+        placeholder.fill(QtGui.QColor(*core.Palette().empty_color))
+        placeholder_icon = QtGui.QIcon(placeholder)
+        self.items = {}
+        file_names = sorted(os.listdir(puzzle_dir)) if os.path.isdir(puzzle_dir) else []
+        for file_name in file_names:
+            if not file_name.endswith(f'.{core.FILE_EXTENSION}'):
+                continue
+            path = os.path.join(puzzle_dir, file_name)
+            item = QtWidgets.QListWidgetItem(placeholder_icon, os.path.splitext(file_name)[0])
+            item.setData(QtCore.Qt.ItemDataRole.UserRole, path)
+            self.list_widget.addItem(item)
+            self.items[path] = item
+            task = thumbnails.ThumbnailTask(path, self.cache)
+            task.signals.finished.connect(self.thumbnail_ready)
+            self.thread_pool.start(task)
+
+        self.list_widget.itemDoubleClicked.connect(self.accept)
+        open_button.clicked.connect(self.accept)
+        cancel_button.clicked.connect(self.reject)
+
+    def thumbnail_ready(self, path, image):
+
+        if path in self.items:
+            self.items[path].setIcon(QtGui.QIcon(QtGui.QPixmap.fromImage(image)))
+
+    def accept(self):
+
+        item = self.list_widget.currentItem()
+        self.selected_path = None if item is None else item.data(QtCore.Qt.ItemDataRole.UserRole)
+        super(PuzzleBrowser, self).accept()
+
+    def done(self, result):
+
+        self.thread_pool.clear()
+        super(PuzzleBrowser, self).done(result)
+
+
 class NewGameDialog(QtWidgets.QDialog):
 
     def __init__(self, parent=None):
@@ -494,7 +1480,7 @@ class NewGameDialog(QtWidgets.QDialog):
         self.column_spin = QtWidgets.QSpinBox()
         for spin in (self.row_spin, self.column_spin):
             spin.setMinimum(5)
-            spin.setMaximum(25)
+            spin.setMaximum(500)
             spin.setSingleStep(5)
             spin.setValue(5)
         create_container(self.layout(), (row_label, self.row_spin, column_label, self.column_spin, None))
@@ -712,6 +1698,41 @@ def get_icon_pixmap(name, color, size=Cell.SIZE):
     return pixmap
 
 
+def create_palette_buttons(palette, callback):
+
+    buttons = []
+    if len(palette.colors) <= 1:
+        return None, buttons
+
+    button_container = QtWidgets.QWidget()
+    button_container.setLayout(QtWidgets.QVBoxLayout())
+    button_container.layout().setSpacing(0)
+    button_container.layout().addStretch()
+    for color in palette.colors:
+        buttons.append(QtWidgets.QToolButton())
+        buttons[-1].setCheckable(True)
+        pixmap = get_icon_pixmap('circle', QtGui.QColor(*color))
+        icon = QtGui.QIcon(pixmap)
+        buttons[-1].setIcon(icon)
+        button_container.layout().addWidget(buttons[-1])
+        buttons[-1].clicked.connect(callback)
+
+    buttons[0].setChecked(True)
+    return button_container, buttons
+
+
+def select_palette_index(buttons, current_index):
+
+    for index, button in enumerate(buttons):
+        if button.isChecked() and index + 1 != current_index:
+            buttons[current_index - 1].setChecked(False)
+            return index + 1
+        elif not button.isChecked() and index + 1 == current_index:
+            buttons[current_index - 1].setChecked(True)
+            break
+    return current_index
+
+
 def get_qt_palettes(palette):
 
     background_color = QtGui.QColor(*palette.background_color)